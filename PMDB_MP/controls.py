@@ -1,14 +1,15 @@
 import tkinter as tk
 import customtkinter as ctk
-from PIL import Image
-import os
-import sys
+import logging
 from PMDB_MP.locales import get_locale
+from PMDB_MP.icons import get_icon_cache
+
+logger = logging.getLogger(__name__)
 
 class PlayerControls(ctk.CTkFrame):
     def __init__(self, master, play_pause_cmd, close_cmd, rewind_cmd, forward_cmd,
                 toggle_mute_cmd, toggle_fullscreen_cmd, toggle_subtitle_cmd=None,
-                show_subtitle_menu_cmd=None, locale=None, **kwargs):
+                show_subtitle_menu_cmd=None, show_audio_menu_cmd=None, locale=None, **kwargs):
 
         self.locale = locale or get_locale("es")
         self.btn_color = "#303338"
@@ -25,7 +26,6 @@ class PlayerControls(ctk.CTkFrame):
         self.toggle_fullscreen_cmd = toggle_fullscreen_cmd
         self.volume_change_cmd = None
         self.embedded_subtitles = []
-        self.base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.volume_icon = self._load_icon("volume")
         self.mute_icon = self._load_icon("mute")
         self.fullscreen_icon = self._load_icon("fullscreen")
@@ -39,9 +39,9 @@ class PlayerControls(ctk.CTkFrame):
         self.subtitle_off_icon = self._load_icon("subtitle-off")
         self.embedded_sub_icon = self._load_icon("embedded-sub")
 
-        for i in [0,  10]:
+        for i in [0,  11]:
             self.grid_columnconfigure(i, weight=1)
-        for i in range(1, 10):
+        for i in range(1, 11):
             self.grid_columnconfigure(i, weight=0)
 
         self.rewind_button = ctk.CTkButton(
@@ -135,6 +135,14 @@ class PlayerControls(ctk.CTkFrame):
             **button_config
         )
         self.embedded_sub_button.grid(row=0, column=9, padx=5, pady=2)
+        self.audio_button = ctk.CTkButton(
+            self,
+            text=self.locale["audio_track"],
+            command=show_audio_menu_cmd if show_audio_menu_cmd else None,
+            state="disabled",
+            **button_config
+        )
+        self.audio_button.grid(row=0, column=10, padx=5, pady=2)
 
         self.embedded_subtitles_available = False
         self.subtitle_menu = None
@@ -161,7 +169,10 @@ class PlayerControls(ctk.CTkFrame):
             self.subtitle_enabled = enabled
             self._update_subtitle_button()
 
-        print(f"[SUBTITLE_BUTTON] Estado actualizado - Disponible: {available}, Activado: {enabled}")
+        logger.debug("[SUBTITLE_BUTTON] Estado actualizado - Disponible: %s, Activado: %s", available, enabled)
+
+    def set_audio_tracks_state(self, available):
+        self.audio_button.configure(state="normal" if available else "disabled")
 
     def _update_subtitle_button(self):
         if self.subtitle_available:
@@ -218,10 +229,6 @@ class PlayerControls(ctk.CTkFrame):
         self.volume_slider.set(volume)
         self.update_mute_button(is_muted)
 
-        print(f"Ruta base del proyecto: {self.base_path}")
-        print(f"Intentando cargar volumen desde: {os.path.join(self.base_path, 'assets', 'icons', 'volume.png')}")
-        print(f"El archivo existe: {os.path.exists(os.path.join(self.base_path, 'assets', 'icons', 'volume.png'))}")
-
     def _update_mute_icon(self):
         if hasattr(self, 'mute_icon') and hasattr(self, 'volume_icon'):
             new_icon = self.mute_icon if self.is_muted else self.volume_icon
@@ -230,33 +237,7 @@ class PlayerControls(ctk.CTkFrame):
             self.mute_button.configure(text="🔇" if self.is_muted else "🔊")
 
     def _load_icon(self, icon_name):
-        base_paths = [
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-            os.path.dirname(sys.executable),
-            getattr(sys, '_MEIPASS', '')
-        ]
-
-        file_names = [
-            f"{icon_name}.png",
-            f"{icon_name}.ico",
-        ]
-
-        for base in base_paths:
-            if not base:
-                continue
-
-            for file in file_names:
-                icon_path = os.path.join(base, "assets", "icons", file)
-                try:
-                    if os.path.exists(icon_path):
-                        print(f"Cargando icono desde: {icon_path}")
-                        return ctk.CTkImage(Image.open(icon_path), size=(24, 24))
-                except Exception as e:
-                    print(f"Error cargando {icon_path}: {str(e)}")
-
-        print(f"Icono no encontrado: {icon_name}. Usando texto alternativo.")
-        return None
+        return get_icon_cache().get(icon_name)
 
     def update_mute_button(self, is_muted):
         if hasattr(self, 'volume_icon') and self.volume_icon:
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import socket
+import tempfile
+import threading
+import logging
+from PMDB_MP.paths import APP_NAME
+from PMDB_MP.log import stop_logging
+
+logger = logging.getLogger(__name__)
+
+# Espera máxima al conectar y a la primera respuesta del daemon (s)
+CONNECT_TIMEOUT = 1.0
+REPLY_TIMEOUT = 5.0
+
+def get_socket_path():
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"{APP_NAME}.sock")
+    return os.path.join(tempfile.gettempdir(), f"{APP_NAME}-{os.getuid()}.sock")
+
+def _connect(timeout):
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(get_socket_path())
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def _send_message(sock, message):
+    sock.sendall((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+
+def _read_message(reader):
+    line = reader.readline()
+    if not line:
+        return None
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+def restart_process():
+    # Reemplaza el proceso por el mismo comando: VLC y Tk empiezan de cero
+    # con el mismo PID. En el ejecutable de PyInstaller argv[0] ya es el binario.
+    stop_logging()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    argv = sys.argv[1:] if getattr(sys, 'frozen', False) else sys.argv
+    os.execv(sys.executable, [sys.executable] + argv)
+
+def send_request(message, wait=True):
+    # Envía una petición al daemon y devuelve su última respuesta, o None si
+    # no hay ningún daemon escuchando. Con wait=True, una petición "open"
+    # espera a que termine la reproducción.
+    sock = _connect(CONNECT_TIMEOUT)
+    if sock is None:
+        return None
+
+    try:
+        _send_message(sock, message)
+        sock.settimeout(REPLY_TIMEOUT)
+        with sock.makefile('r', encoding='utf-8') as reader:
+            reply = _read_message(reader)
+            if reply and reply.get('status') == 'playing' and wait:
+                sock.settimeout(None)
+                # Si el daemon muere durante la reproducción se da por terminada
+                reply = _read_message(reader) or {'status': 'ended', 'path': message.get('path')}
+        return reply
+    except OSError as e:
+        logger.error("[DAEMON] Error comunicando con el daemon: %s", e)
+        return None
+    finally:
+        sock.close()
+
+
+class PlayerDaemon:
+    # Mantiene un VideoPlayer residente (ventana oculta, VLC y tema ya
+    # cargados) y abre los videos que llegan por un socket UNIX local.
+    # Cada petición recibe "playing" al empezar y "ended" al cerrarse el video.
+
+    IDLE_TIMEOUT = 30 * 60
+    MAX_SESSIONS = 50
+
+    def __init__(self, player, idle_timeout=None, max_sessions=None):
+        self.player = player
+        self.idle_timeout = self.IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.max_sessions = self.MAX_SESSIONS if max_sessions is None else max_sessions
+        self.socket_path = get_socket_path()
+        self.sessions = 0
+        # Al volver de mainloop(), main.py reinicia el proceso si es True
+        self.restart = False
+        self._server = None
+        self._client = None
+        self._idle_id = None
+        self._running = False
+
+    def start(self):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("El modo daemon necesita sockets UNIX")
+
+        probe = _connect(CONNECT_TIMEOUT)
+        if probe:
+            probe.close()
+            raise OSError(f"Ya hay un daemon escuchando en {self.socket_path}")
+
+        # Socket huérfano de un daemon anterior
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(4)
+
+        self._server = server
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        self._schedule_idle_timeout()
+        logger.info("[DAEMON] Escuchando en %s", self.socket_path)
+
+    def stop(self, restart=False):
+        if not self._running:
+            return
+        self._running = False
+        self.restart = restart
+        self._cancel_idle_timeout()
+
+        try:
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+        if self._client:
+            self._client.close()
+            self._client = None
+
+        if restart:
+            logger.info("[DAEMON] Reiniciando tras %s sesiones", self.sessions)
+        else:
+            logger.info("[DAEMON] Detenido tras %s sesiones", self.sessions)
+        self.player.shutdown()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+
+            try:
+                conn.settimeout(CONNECT_TIMEOUT)
+                with conn.makefile('r', encoding='utf-8') as reader:
+                    request = _read_message(reader)
+                conn.settimeout(None)
+            except OSError:
+                request = None
+
+            if not request:
+                conn.close()
+                continue
+            self._run_on_ui(self._handle_request, conn, request)
+
+    def _run_on_ui(self, callback, *args):
+        # El hilo del socket no toca Tk: la cola del reproductor lo entrega
+        self.player._run_on_ui(callback, *args)
+
+    def _reply(self, conn, message):
+        try:
+            _send_message(conn, message)
+        except OSError:
+            # El cliente ya no espera la respuesta
+            pass
+
+    def _handle_request(self, conn, request):
+        command = request.get('command')
+
+        if command == 'shutdown':
+            self._reply(conn, {'status': 'stopping'})
+            conn.close()
+            self.stop()
+            return
+
+        path = request.get('path')
+        if command != 'open' or not path:
+            self._reply(conn, {'status': 'error', 'message': f"Petición no válida: {command}"})
+            conn.close()
+            return
+
+        if self.player.video_path:
+            self._reply(conn, {'status': 'busy'})
+            conn.close()
+            return
+
+        if not os.path.exists(path):
+            self._reply(conn, {'status': 'error', 'message': f"El archivo '{path}' no existe"})
+            conn.close()
+            return
+
+        self._cancel_idle_timeout()
+        self._client = conn
+        try:
+            self.player.open(path, fullscreen=bool(request.get('fullscreen')),
+                             on_finished=self._on_session_end)
+        except Exception as e:
+            logger.exception("[DAEMON] Error abriendo %s: %s", path, e)
+            self._client = None
+            self._reply(conn, {'status': 'error', 'message': str(e)})
+            conn.close()
+            # El reproductor puede haber quedado a medias: se recicla
+            self._run_on_ui(self.stop, True)
+            return
+
+        logger.info("[DAEMON] Reproduciendo %s", path)
+        self._reply(conn, {'status': 'playing', 'path': path})
+
+    def _on_session_end(self, result):
+        self.sessions += 1
+        conn, self._client = self._client, None
+        if conn:
+            self._reply(conn, dict(result, status='ended'))
+            conn.close()
+
+        if self.max_sessions and self.sessions >= self.max_sessions:
+            logger.info("[DAEMON] Reciclando tras %s sesiones", self.sessions)
+            self._run_on_ui(self.stop, True)
+        else:
+            self._schedule_idle_timeout()
+
+    def _schedule_idle_timeout(self):
+        self._cancel_idle_timeout()
+        if self.idle_timeout:
+            self._idle_id = self.player.root.after(int(self.idle_timeout * 1000), self._on_idle_timeout)
+
+    def _cancel_idle_timeout(self):
+        if self._idle_id:
+            self.player.root.after_cancel(self._idle_id)
+            self._idle_id = None
+
+    def _on_idle_timeout(self):
+        self._idle_id = None
+        logger.info("[DAEMON] Sin peticiones durante %s s, cerrando", self.idle_timeout)
+        self.stop()
@@ -1,10 +1,26 @@
 import os
 import sys
+import glob
 import threading
 import time
-import traceback
+import logging
 import customtkinter as ctk
-import pygame
+
+logger = logging.getLogger(__name__)
+
+# pygame se importa al arrancar el hilo del gamepad, fuera del camino crítico
+pygame = None
+
+def _load_pygame():
+    global pygame
+    if pygame is None:
+        os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+        # Solo se usa la cola de eventos de SDL: sin ventana ni audio propios
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_JOYSTICK_ALLOW_BACKGROUND_EVENTS', '1')
+        import pygame as pygame_module
+        pygame = pygame_module
+    return pygame
 
 class GamepadController:
 
@@ -13,6 +29,9 @@ class GamepadController:
         1: 'secondary',
         2: 'tertiary',
         3: 'quaternary',
+        4: 'left_bumper',
+        5: 'right_bumper',
+        6: 'back',
     }
 
     HAT_MAP = {
@@ -28,18 +47,26 @@ class GamepadController:
         'secondary': 'toggle_subtitle',
         'tertiary': 'fullscreen',
         'quaternary': 'close',
+        'left_bumper': 'previous_line',
+        'right_bumper': 'next_line',
+        'back': 'cycle_audio',
     }
 
+    # (botón mantenido, botón pulsado) -> acción
+    CHORD_MAP = {
+        (7, 6): 'toggle_stats',
+    }
+
+    # Espera máxima de pygame.event.wait antes de revisar si hay que detenerse (ms)
+    EVENT_WAIT_TIMEOUT = 500
+
     def __init__(self, player):
-        pygame.init()
-        pygame.joystick.init()
         self.player = player
         self.joystick = None
         self.running = False
         self.active = False
         self.thread = None
         self.last_event_time = time.time()
-        self.debug_mode = True
         self.current_device_name = None
         self.last_notification_time = 0
         self.notification_cooldown = 5.0
@@ -54,9 +81,29 @@ class GamepadController:
         self.notification_position = "bottom_left"
         self.notification_duration = 1000
 
-    def debug_log(self, message):
-        if self.debug_mode:
-            print(f"🕹️ [Gamepad] {message}")
+    @staticmethod
+    def input_devices_present():
+        # En Linux se puede saber sin iniciar SDL si hay algún mando; en otros
+        # sistemas se asume que sí.
+        if not sys.platform.startswith('linux') or not os.path.isdir('/dev/input'):
+            return True
+        patterns = ['/dev/input/js*', '/dev/input/by-id/*-joystick', '/dev/input/by-id/*-event-joystick']
+        return any(glob.glob(pattern) for pattern in patterns)
+
+    def _init_sdl(self):
+        # Solo los subsistemas de eventos y joystick: pygame.init() levantaría
+        # también audio/mixer/fuentes, que además compiten con la salida de VLC.
+        _load_pygame()
+        pygame.display.init()
+        pygame.joystick.init()
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([
+            pygame.JOYBUTTONDOWN,
+            pygame.JOYHATMOTION,
+            pygame.JOYDEVICEADDED,
+            pygame.JOYDEVICEREMOVED,
+            pygame.USEREVENT
+        ])
 
     def _show_notification(self, message, is_success=True):
         self._hide_notification()
@@ -120,15 +167,19 @@ class GamepadController:
         handlers = {
             'play_pause': self._handle_play_pause,
             'toggle_subtitle': self._cycle_subtitles,
+            'cycle_audio': self._cycle_audio_tracks,
+            'previous_line': lambda: self._jump_to_line(forward=False),
+            'next_line': lambda: self._jump_to_line(forward=True),
             'fullscreen': self._handle_fullscreen,
             'close': self.player.close_player,
             'rewind_10s': self._handle_rewind,
             'forward_10s': self._handle_forward,
             'vol_up': self._handle_volume_up,
-            'vol_down': self._handle_volume_down
+            'vol_down': self._handle_volume_down,
+            'toggle_stats': self.player.stats.toggle
         }
         return handlers.get(action_name)
-        self.debug_log(f"Handler para '{action_name}': {handler}")
+        logger.debug("Handler para '%s': %s", action_name, handler)
         return handler
 
     def _handle_play_pause(self):
@@ -172,21 +223,18 @@ class GamepadController:
             current_time = self.player.player.get_time()
             new_time = max(0, current_time + ms)
             self.player.player.set_time(new_time)
-            self.debug_log(f"Navegación: {current_time}ms → {new_time}ms")
+            self.player._mark_event('seek', target=new_time)
+            logger.debug("Navegación: %sms → %sms", current_time, new_time)
         except Exception as e:
-            self.debug_log(f"Error en navegación: {str(e)}")
+            logger.error("Error en navegación: %s", e)
 
     def _cycle_subtitles(self):
         try:
             has_external_sub = hasattr(self.player, 'subtitle_path') and self.player.subtitle_path
-
-            if not hasattr(self.player, 'embedded_subtitles'):
-                self.player._detect_embedded_subtitles()
-
             has_embedded_subs = bool(getattr(self.player, 'embedded_subtitles', []))
 
             if not has_external_sub and not has_embedded_subs:
-                self.debug_log("No hay subtítulos disponibles")
+                logger.debug("No hay subtítulos disponibles")
                 self.player.root.after(0, lambda: self._show_notification("No hay subtítulos disponibles", False))
                 return
 
@@ -203,7 +251,7 @@ class GamepadController:
                         message += "Externos ACTIVADOS"
                     except Exception as e:
                         message += "Error activando externos"
-                        self.debug_log(f"Error cargando subtítulo externo: {e}")
+                        logger.error("Error cargando subtítulo externo: %s", e)
                 elif has_embedded_subs:
                     first_sub = self.player.embedded_subtitles[0]
                     try:
@@ -214,7 +262,7 @@ class GamepadController:
                         message += f"{sub_name}"
                     except Exception as e:
                         message += "Error activando incrustados"
-                        self.debug_log(f"Error activando subtítulo incrustado: {e}")
+                        logger.error("Error activando subtítulo incrustado: %s", e)
 
             elif current_spu == 0 and has_external_sub and self.player.subtitle_enabled:
                 if has_embedded_subs:
@@ -226,7 +274,7 @@ class GamepadController:
                         message += f"{sub_name}"
                     except Exception as e:
                         message += "Error cambiando a incrustados"
-                        self.debug_log(f"Error cambiando a subtítulo incrustado: {e}")
+                        logger.error("Error cambiando a subtítulo incrustado: %s", e)
                 else:
                     self.player.player.video_set_spu(-1)
                     self.player.subtitle_enabled = False
@@ -254,81 +302,158 @@ class GamepadController:
                         message += f"{sub_name}"
                     except Exception as e:
                         message += "Error cambiando pista"
-                        self.debug_log(f"Error cambiando a siguiente subtítulo: {e}")
+                        logger.error("Error cambiando a siguiente subtítulo: %s", e)
             else:
                 self.player.player.video_set_spu(-1)
                 self.player.subtitle_enabled = False
                 message += "DESACTIVADOS"
 
+            self.player._mark_event('subtitle', spu=self.player.player.video_get_spu())
+            self.player._remember_track_choices()
             is_success = not message.endswith("Error") and not message.endswith("DESACTIVADOS")
             self.player.root.after(0, lambda: self.player.controls.set_subtitle_state(
                 has_external_sub or has_embedded_subs,
                 self.player.subtitle_enabled
             ))
-            self.debug_log(message)
+            logger.debug("%s", message)
             self.player.root.after(0, lambda: self._show_notification(message, is_success))
 
         except Exception as e:
             error_msg = f"Error cambiando subtítulos: {str(e)}"
-            self.debug_log(error_msg)
-            traceback.print_exc()
+            logger.exception("%s", error_msg)
             self.player.root.after(0, lambda: self._show_notification(error_msg, False))
 
+    def _cycle_audio_tracks(self):
+        tracks = (self.player.media_tracks or {}).get('audio', [])
+        if len(tracks) < 2:
+            self._show_notification("No hay otras pistas de audio", False)
+            return
+
+        current = self.player.player.audio_get_track()
+        index = next((i for i, track in enumerate(tracks) if track['id'] == current), -1)
+        track = tracks[(index + 1) % len(tracks)]
+        if self.player._select_audio_track(track['id']):
+            self._show_notification(f"Audio: {track['name']}")
+        else:
+            self._show_notification("Error cambiando audio", False)
+
+    def _jump_to_line(self, forward):
+        if not self.player.subtitle_cues:
+            self._show_notification("Sin subtítulos externos", False)
+            return
+
+        cue = self.player._jump_to_line(forward)
+        if cue:
+            text = ' '.join(cue[2].split())
+            self._show_notification(text if len(text) <= 60 else f"{text[:57]}...")
+        elif not self.player.subtitle_cues.ready:
+            self._show_notification("Leyendo subtítulos...", False)
+        else:
+            self._show_notification("No hay más diálogos", False)
+
     def _adjust_volume(self, delta):
         try:
             current = self.player.player.audio_get_volume()
             new_vol = max(0, min(100, current + delta))
-            self.debug_log(f"Ajustando volumen: {current} → {new_vol}")
+            logger.debug("Ajustando volumen: %s → %s", current, new_vol)
             self.player._on_volume_change(new_vol)
             self.player.controls.volume_slider.set(new_vol)
         except Exception as e:
-            self.debug_log(f"Error ajustando volumen: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error ajustando volumen: %s", e)
 
     def start(self):
         self.running = True
         self.thread = threading.Thread(target=self._listen, daemon=True)
         self.thread.start()
-        self.debug_log("Sistema de gamepad iniciado (pygame)")
+        logger.debug("Sistema de gamepad iniciado (pygame)")
         return True
 
     def stop(self):
         self.running = False
+        if pygame:
+            try:
+                # Despierta al hilo bloqueado en pygame.event.wait
+                pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+            except pygame.error:
+                pass
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=1)
-        pygame.quit()
+        if pygame:
+            pygame.quit()
         self._hide_notification()
-        self.debug_log("Sistema de gamepad detenido")
+        logger.debug("Sistema de gamepad detenido")
 
     def _listen(self):
+        # Bloquea en la cola de eventos de SDL en lugar de sondear; la conexión
+        # y desconexión llegan como JOYDEVICEADDED/JOYDEVICEREMOVED (SDL emite
+        # JOYDEVICEADDED también para los mandos ya conectados al iniciar).
+        try:
+            self._init_sdl()
+        except Exception as e:
+            logger.warning("No se pudo iniciar SDL: %s", e)
+            self.running = False
+            return
+
         while self.running:
-            if not self.active:
-                pygame.joystick.quit()
-                pygame.joystick.init()
-                joystick_count = pygame.joystick.get_count()
-
-                if joystick_count > 0:
-                    self.joystick = pygame.joystick.Joystick(0)
-                    self.joystick.init()
-                    self.current_device_name = self.joystick.get_name()
-                    self.active = True
-                    self.debug_log(f"Gamepad conectado: {self.current_device_name}")
-                    self.debug_log(f"Número de hats: {self.joystick.get_numhats()}")
-                    self.debug_log(f"Número de botones: {self.joystick.get_numbuttons()}")
-                    self.player.root.after(0, lambda: self._show_notification(f"Gamepad conectado: {self.current_device_name}", True))
-                else:
-                    time.sleep(2)
-                    continue
+            event = pygame.event.wait(self.EVENT_WAIT_TIMEOUT)
+            if not self.running:
+                break
+            if event.type == pygame.NOEVENT:
+                continue
+
+            received = time.perf_counter()
+            if event.type == pygame.JOYDEVICEADDED:
+                self._on_device_added(event.device_index)
+            elif event.type == pygame.JOYDEVICEREMOVED:
+                self._on_device_removed(event.instance_id)
+            else:
+                self._handle_event(event, received)
+
+    def _on_device_added(self, device_index):
+        if self.active:
+            return
+
+        try:
+            self.joystick = pygame.joystick.Joystick(device_index)
+            self.joystick.init()
+        except pygame.error as e:
+            logger.warning("No se pudo abrir el gamepad %s: %s", device_index, e)
+            self.joystick = None
+            return
+
+        self.current_device_name = self.joystick.get_name()
+        self.active = True
+        logger.info("Gamepad conectado: %s", self.current_device_name)
+        logger.debug("Número de hats: %s", self.joystick.get_numhats())
+        logger.debug("Número de botones: %s", self.joystick.get_numbuttons())
+        self.player._run_on_ui(self._show_notification, f"Gamepad conectado: {self.current_device_name}", True)
+
+    def _on_device_removed(self, instance_id):
+        if not self.joystick or self.joystick.get_instance_id() != instance_id:
+            return
+
+        name = self.current_device_name
+        self.joystick = None
+        self.active = False
+        self.current_device_name = None
+        logger.info("Gamepad desconectado: %s", name)
+        self.player._run_on_ui(self._show_notification, f"Gamepad desconectado: {name}", False)
 
-            for event in pygame.event.get():
-                if not self.running:
-                    break
+        # Si queda otro mando conectado se usa ese
+        if pygame.joystick.get_count() > 0:
+            self._on_device_added(0)
 
-                self._handle_event(event)
+    def _dispatch(self, action_name, handler, received):
+        # Desde el hilo de SDL: Tk solo se toca desde su propio hilo
+        self.player._run_on_ui(self._run_action, action_name, handler, received)
 
-            time.sleep(0.01)
+    def _run_action(self, action_name, handler, received):
+        handler()
+        if logger.isEnabledFor(logging.DEBUG):
+            latency = (time.perf_counter() - received) * 1000
+            logger.debug("Latencia entrada→acción '%s': %.1f ms", action_name, latency)
 
-    def _handle_event(self, event):
+    def _handle_event(self, event, received):
         try:
             current_time = time.time()
 
@@ -336,47 +461,59 @@ class GamepadController:
                 if current_time - self.last_event_time < self.button_repeat_delay:
                     return
 
-                if event.button in self.BUTTON_MAP:
+                chord = self._chord_action(event.button)
+                if chord:
+                    logger.debug("Combinación → %s", chord)
+                    self._dispatch(chord, self._get_action_handler(chord), received)
+                    self.last_event_time = current_time
+                elif event.button in self.BUTTON_MAP:
                     button_function = self.BUTTON_MAP[event.button]
                     action_name = self.ACTION_MAP.get(button_function)
                     if action_name:
-                        self.debug_log(f"Botón {event.button} → {action_name}")
-                        self.player.root.after(0, self._get_action_handler(action_name))
+                        logger.debug("Botón %s → %s", event.button, action_name)
+                        self._dispatch(action_name, self._get_action_handler(action_name), received)
                         self.last_event_time = current_time
 
             elif event.type == pygame.JOYHATMOTION:
-                self.debug_log(f"HAT evento detectado: {event.value}")
+                logger.debug("HAT evento detectado: %s", event.value)
 
                 if (event.value != (0, 0) and
                     event.value != self.last_hat_value and
                     current_time - self.last_event_time > self.button_repeat_delay):
 
-                    self.debug_log(f"Procesando HAT: {event.value}")
+                    logger.debug("Procesando HAT: %s", event.value)
 
                     if event.value in self.HAT_MAP:
                         action_name = self.HAT_MAP[event.value]
-                        self.debug_log(f"Action_name encontrado: {action_name}")
+                        logger.debug("Action_name encontrado: %s", action_name)
 
                         if action_name:
                             action = self._get_action_handler(action_name)
-                            self.debug_log(f"Action handler: {action}")
+                            logger.debug("Action handler: %s", action)
 
                             if action:
-                                self.debug_log(f"Ejecutando: Cruceta {event.value} → {action_name}")
-                                self.player.root.after(0, action)
+                                logger.debug("Ejecutando: Cruceta %s → %s", event.value, action_name)
+                                self._dispatch(action_name, action, received)
                                 self.last_event_time = current_time
                             else:
-                                self.debug_log(f"ERROR: No se encontró handler para {action_name}")
+                                logger.error("No se encontró handler para %s", action_name)
                     else:
-                        self.debug_log(f"ERROR: Valor HAT {event.value} no está en HAT_MAP")
+                        logger.debug("Valor HAT %s no está en HAT_MAP", event.value)
 
                 self.last_hat_value = event.value
             elif event.type in [pygame.JOYAXISMOTION, pygame.JOYBUTTONUP]:
                 pass
 
         except Exception as e:
-            self.debug_log(f"Error procesando evento: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error procesando evento: %s", e)
+
+    def _chord_action(self, button):
+        if not self.joystick:
+            return None
+        for (held, pressed), action_name in self.CHORD_MAP.items():
+            if button == pressed and held < self.joystick.get_numbuttons() and self.joystick.get_button(held):
+                return action_name
+        return None
 
     def _get_axis_action(self, axis_function, direction):
         axis_actions = {
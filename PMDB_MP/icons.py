@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import hashlib
+import logging
+from PIL import Image
+import customtkinter as ctk
+
+logger = logging.getLogger(__name__)
+
+ICON_SIZE = (24, 24)
+ATLAS_IMAGE = 'icons-atlas.png'
+ATLAS_INDEX = 'icons-atlas.json'
+# Iconos que no son de los controles y no entran en el atlas
+ATLAS_EXCLUDE = ('pmdbmp',)
+
+def find_icons_dir():
+    base_paths = [
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        os.path.dirname(sys.executable),
+        getattr(sys, '_MEIPASS', '')
+    ]
+    for base in base_paths:
+        if not base:
+            continue
+        icons_dir = os.path.join(base, "assets", "icons")
+        if os.path.isdir(icons_dir):
+            return icons_dir
+    return None
+
+def _atlas_names(icons_dir):
+    return sorted(
+        os.path.splitext(entry.name)[0] for entry in os.scandir(icons_dir)
+        if entry.name.endswith('.png') and entry.name != ATLAS_IMAGE
+        and os.path.splitext(entry.name)[0] not in ATLAS_EXCLUDE
+    )
+
+def icons_digest(icons_dir, names):
+    # Hash del contenido de los PNG: las fechas no sirven para validar el
+    # atlas porque PyInstaller (--onefile) no las conserva al extraer
+    digest = hashlib.sha1()
+    for name in names:
+        digest.update(name.encode('utf-8') + b'\0')
+        with open(os.path.join(icons_dir, f"{name}.png"), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def build_atlas(icons_dir):
+    # Une los PNG de los controles en una sola imagen (una fila) y guarda
+    # la posición de cada uno en un índice JSON. Lo llama build.py.
+    names = _atlas_names(icons_dir)
+
+    images = []
+    for name in names:
+        with Image.open(os.path.join(icons_dir, f"{name}.png")) as image:
+            images.append(image.convert('RGBA'))
+
+    width = sum(image.width for image in images)
+    height = max((image.height for image in images), default=0)
+    atlas = Image.new('RGBA', (max(width, 1), max(height, 1)))
+    index = {}
+    x = 0
+    for name, image in zip(names, images):
+        atlas.paste(image, (x, 0))
+        index[name] = [x, 0, image.width, image.height]
+        x += image.width
+
+    atlas.save(os.path.join(icons_dir, ATLAS_IMAGE), optimize=True)
+    with open(os.path.join(icons_dir, ATLAS_INDEX), 'w', encoding='utf-8') as f:
+        json.dump({'digest': icons_digest(icons_dir, names), 'icons': index}, f, indent=2)
+    return names
+
+
+class IconCache:
+    # Decodifica cada icono una sola vez y comparte el mismo CTkImage entre
+    # todos los widgets; CTkImage guarda a su vez una copia escalada por cada
+    # factor de DPI, así que recrear los controles no vuelve a leer ni
+    # reescalar nada. Si existe el atlas se lee un único archivo.
+
+    def __init__(self, icons_dir=None):
+        self.icons_dir = icons_dir or find_icons_dir()
+        self._sources = {}
+        self._images = {}
+        self._atlas_loaded = False
+
+    def get(self, name, size=ICON_SIZE):
+        key = (name, tuple(size))
+        if key not in self._images:
+            source = self._get_source(name)
+            self._images[key] = ctk.CTkImage(source, size=size) if source else None
+        return self._images[key]
+
+    def _get_source(self, name):
+        if not self._atlas_loaded:
+            self._atlas_loaded = True
+            self._load_atlas()
+
+        if name not in self._sources:
+            self._sources[name] = self._load_file(name)
+        return self._sources[name]
+
+    def _load_atlas(self):
+        if not self.icons_dir:
+            return
+        atlas_path = os.path.join(self.icons_dir, ATLAS_IMAGE)
+        index_path = os.path.join(self.icons_dir, ATLAS_INDEX)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('digest') != icons_digest(self.icons_dir, _atlas_names(self.icons_dir)):
+                # Algún icono cambió (p. ej. uno personalizado) después de generar el atlas
+                logger.debug("[ICONS] El atlas no corresponde a los iconos actuales")
+                return
+            index = data['icons']
+            with Image.open(atlas_path) as atlas:
+                atlas = atlas.convert('RGBA')
+                for name, (x, y, w, h) in index.items():
+                    self._sources[name] = atlas.crop((x, y, x + w, y + h))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("[ICONS] Atlas no válido, se usan los archivos sueltos: %s", e)
+            self._sources.clear()
+            return
+        logger.debug("[ICONS] %s iconos cargados desde %s", len(index), atlas_path)
+
+    def _load_file(self, name):
+        if self.icons_dir:
+            for ext in ('png', 'ico'):
+                icon_path = os.path.join(self.icons_dir, f"{name}.{ext}")
+                try:
+                    if os.path.exists(icon_path):
+                        logger.debug("Cargando icono desde: %s", icon_path)
+                        with Image.open(icon_path) as image:
+                            return image.convert('RGBA')
+                except Exception as e:
+                    logger.error("Error cargando %s: %s", icon_path, e)
+
+        logger.warning("Icono no encontrado: %s. Usando texto alternativo.", name)
+        return None
+
+
+_icon_cache = None
+
+def get_icon_cache():
+    global _icon_cache
+    if _icon_cache is None:
+        _icon_cache = IconCache()
+    return _icon_cache
+
+
+if __name__ == '__main__':
+    icons_dir = find_icons_dir()
+    if not icons_dir:
+        sys.exit("No se encontró la carpeta assets/icons")
+    print(f"Atlas generado con: {', '.join(build_atlas(icons_dir))}")
@@ -19,7 +19,17 @@ LOCALES = {
         "no_fullscreen": "🔍",
         "subtitle_on": "Subtítulos: ON",
         "subtitle_off": "Subtítulos: OFF",
-        "embedded_sub": "Subtítulos embebidos"
+        "embedded_sub": "Subtítulos embebidos",
+        "audio_track": "Audio",
+        "select_audio": "Seleccionar audio",
+        "search_subtitles_title": "Buscar en los subtítulos",
+        "search_subtitles_prompt": "Texto del diálogo:",
+        "stats_waiting": "Estadísticas: midiendo...",
+        "stats_bitrate": "Entrada {} kb/s   Demux {} kb/s",
+        "stats_video": "Video   {} decod.  {} mostradas  {} perdidas",
+        "stats_audio": "Audio   {} decod.  {} búferes perdidos",
+        "stats_decoder": "Decodificador: {}",
+        "stats_mark": "Evento: {} (hace {:.0f} s)"
     },
     "en": {
         "player_title": "PMDB Media Player - {}",
@@ -41,7 +51,17 @@ LOCALES = {
         "no_fullscreen": "🔍",
         "subtitle_on": "Subtitles: ON",
         "subtitle_off": "Subtitles: OFF",
-        "embedded_sub": "Embedded subtitles"
+        "embedded_sub": "Embedded subtitles",
+        "audio_track": "Audio",
+        "select_audio": "Select audio track",
+        "search_subtitles_title": "Search subtitles",
+        "search_subtitles_prompt": "Dialogue text:",
+        "stats_waiting": "Statistics: measuring...",
+        "stats_bitrate": "Input {} kb/s   Demux {} kb/s",
+        "stats_video": "Video   {} decoded  {} shown  {} lost",
+        "stats_audio": "Audio   {} decoded  {} buffers lost",
+        "stats_decoder": "Decoder: {}",
+        "stats_mark": "Event: {} ({:.0f} s ago)"
     }
 }
 
@@ -0,0 +1,43 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+# Tamaño máximo del archivo de registro antes de rotarlo
+LOG_FILE_BYTES = 5 * 1024 * 1024
+
+_listener = None
+
+def setup_logging(level='WARNING', log_file=None):
+    # Los módulos solo encolan registros; la consola y el archivo se escriben
+    # desde el hilo del QueueListener, así un stdout lento (p. ej. una tubería
+    # que Pegasus no vacía) no bloquea el hilo de la interfaz.
+    global _listener
+    if _listener:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_BYTES, backupCount=2, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    # El nivel elegido se aplica al reproductor; las bibliotecas quedan en WARNING
+    root.setLevel(logging.WARNING)
+    logging.getLogger('PMDB_MP').setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
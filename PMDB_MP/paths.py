@@ -0,0 +1,70 @@
+import os
+import json
+import hashlib
+import platform
+from pathlib import Path
+
+APP_NAME = 'pmdb-mp'
+
+def get_cache_dir(*parts):
+    system = platform.system().lower()
+
+    if system == 'windows':
+        appdata = os.getenv('LOCALAPPDATA') or (Path.home() / 'AppData' / 'Local')
+        base = Path(appdata) / APP_NAME / 'cache'
+    elif system == 'darwin':
+        base = Path.home() / 'Library' / 'Caches' / APP_NAME
+    else:
+        base = Path(os.getenv('XDG_CACHE_HOME') or (Path.home() / '.cache')) / APP_NAME
+
+    path = base.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def get_config_dir(*parts):
+    system = platform.system().lower()
+
+    if system == 'windows':
+        appdata = os.getenv('APPDATA') or (Path.home() / 'AppData' / 'Roaming')
+        base = Path(appdata) / APP_NAME
+    elif system == 'darwin':
+        base = Path.home() / 'Library' / 'Application Support' / APP_NAME
+    else:
+        base = Path(os.getenv('XDG_CONFIG_HOME') or (Path.home() / '.config')) / APP_NAME
+
+    path = base.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def file_identity(path):
+    # Identifica un archivo por ruta, tamaño y fecha: si se reemplaza, cambia.
+    # None si no se puede leer.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    identity = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+def read_json_cache(path):
+    # Caché JSON de la aplicación: un diccionario, vacío si falta o está dañada
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return data
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def write_json_cache(path, data, indent=None):
+    # Escritura atómica (archivo temporal + os.replace); lanza OSError
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
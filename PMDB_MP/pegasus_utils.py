@@ -2,16 +2,54 @@ import os
 import sys
 import json
 import platform
+import threading
+import time
+import logging
+from contextlib import contextmanager
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
 class PegasusUtils:
-    def __init__(self):
+    # Tamaño a partir del cual el journal se compacta en segundo plano
+    JOURNAL_COMPACT_BYTES = 64 * 1024
+    # Segundos que se agrupan los cambios antes de escribirlos a disco
+    FLUSH_INTERVAL = 2.0
+    # Espera máxima por el bloqueo compartido con otras instancias
+    LOCK_TIMEOUT = 2.0
+    # Pistas elegidas por título, guardadas junto a x-lastPosition
+    TRACK_CHOICE_KEYS = ('x-audioTrack', 'x-audioLanguage', 'x-subtitleTrack', 'x-subtitleLanguage')
+
+    def __init__(self, flush_interval=None):
         self.pegasus_config_dir = self._find_pegasus_config_dir()
         self.theme_dir = self._find_theme_dir()
         self.database_path = self._get_database_path()
+        self.journal_path = self._get_journal_path()
+        self.pending_journal_path = self.journal_path.with_name(self.journal_path.name + '.compacting')
+        self.lock_path = self.database_path.with_name(self.database_path.name + '.lock')
+        self._journal_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compact_thread = None
+        self.flush_interval = self.FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._cache_lock = threading.RLock()
+        # Serializa las escrituras del journal sin bloquear a quien marca cambios
+        self._flush_lock = threading.Lock()
+        self._entries = None
+        self._dirty = {}
+        self._database_stat = None
+        self._flush_timer = None
         self._ensure_dirs_exist()
         self._ensure_database_exists()
 
+        if self.journal_path.exists() or self.pending_journal_path.exists():
+            self._compact_in_background()
+
     def _find_pegasus_config_dir(self):
         system = platform.system().lower()
         username = os.getenv('USER') or os.getenv('USERNAME')
@@ -77,73 +115,351 @@ class PegasusUtils:
     def _get_database_path(self):
         return self.theme_dir / 'database.json'
 
+    def _get_journal_path(self):
+        return self.theme_dir / 'database.json.journal'
+
     def _ensure_dirs_exist(self):
         self.theme_dir.mkdir(parents=True, exist_ok=True)
 
     def _ensure_database_exists(self):
         if not self.database_path.exists():
-            with open(self.database_path, 'w', encoding='utf-8') as f:
-                json.dump({}, f, indent=4)
+            try:
+                with open(self.database_path, 'x', encoding='utf-8') as f:
+                    json.dump({}, f, indent=4)
+            except FileExistsError:
+                pass
 
-    def save_video_position(self, video_name, position_ms):
+    @contextmanager
+    def _database_lock(self):
+        # Bloqueo consultivo compartido por todas las instancias del reproductor
+        self._ensure_dirs_exist()
+        with open(self.lock_path, 'a+') as f:
+            deadline = time.monotonic() + self.LOCK_TIMEOUT
+            while True:
+                try:
+                    if fcntl:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Database lock busy: {self.lock_path}")
+                    time.sleep(0.02)
+
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _append_journal(self, records):
+        lines = ''.join(
+            json.dumps({"key": video_name, "fields": fields}, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for video_name, fields in records
+        )
+        with self._database_lock(), self._journal_lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            size = self.journal_path.stat().st_size
+
+        if size >= self.JOURNAL_COMPACT_BYTES:
+            self._compact_in_background()
+
+    def _read_journal(self, path):
+        records = []
         try:
-            self._ensure_dirs_exist()
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Línea incompleta de una escritura interrumpida
+                        continue
+                    if not isinstance(record, dict) or 'key' not in record:
+                        continue
+                    if isinstance(record.get('fields'), dict):
+                        records.append((record['key'], record['fields']))
+                    elif 'value' in record:
+                        # Formato anterior (entrada completa): se mezcla igual
+                        value = record['value']
+                        records.append((record['key'], value if isinstance(value, dict) else None))
+        except FileNotFoundError:
+            pass
+        return records
 
-            data = {}
-            if self.database_path.exists():
-                try:
-                    with open(self.database_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                except json.JSONDecodeError:
-                    data = {}
+    def _apply_journal(self, data, records):
+        # Mezcla campo a campo: lo que el tema u otra instancia guardó en el
+        # mismo título se conserva. fields=None borra la entrada entera.
+        for video_name, fields in records:
+            if fields is None:
+                data.pop(video_name, None)
+                continue
+            current = data.get(video_name)
+            entry = dict(current) if isinstance(current, dict) else {}
+            for key, value in fields.items():
+                if value is None:
+                    entry.pop(key, None)
+                else:
+                    entry[key] = value
+            if entry:
+                data[video_name] = entry
+            else:
+                data.pop(video_name, None)
+        return data
 
-            if not isinstance(data, dict):
+    def _load_database(self, strict=False):
+        data = {}
+        if self.database_path.exists():
+            try:
+                with open(self.database_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except json.JSONDecodeError:
+                # Nunca sobrescribir un archivo ilegible: puede estar a medio escribir
+                if strict:
+                    raise
                 data = {}
 
-            data[video_name] = {
-                "x-lastPosition": position_ms
-            }
+        if not isinstance(data, dict):
+            if strict:
+                raise ValueError(f"Unexpected database format: {self.database_path}")
+            data = {}
+        return data
 
-            with open(self.database_path, 'w', encoding='utf-8') as f:
+    def _load_entries(self, strict=False):
+        data = self._load_database(strict)
+        self._apply_journal(data, self._read_journal(self.pending_journal_path))
+        self._apply_journal(data, self._read_journal(self.journal_path))
+        return data
+
+    def _write_database(self, data):
+        tmp_path = self.database_path.with_name(f"{self.database_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.database_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self._fsync_dir()
+        self._database_stat = self._stat_database()
+
+    def _fsync_dir(self):
+        if os.name != 'posix':
+            return
+        fd = os.open(self.theme_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _stat_database(self):
+        try:
+            stat = self.database_path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _get_entries(self):
+        with self._cache_lock:
+            if self._entries is None:
+                self._database_stat = self._stat_database()
+                self._entries = self._load_entries()
+            return self._entries
+
+    def _reload_if_changed(self):
+        # Otro proceso (p. ej. PMDB-Theme) modificó database.json
+        stat = self._stat_database()
+        if self._entries is None or stat == self._database_stat:
+            return
+        try:
+            entries = self._load_entries(strict=True)
+        except (ValueError, OSError) as e:
+            logger.warning("database.json no legible, se conserva la caché: %s", e)
+            return
+        self._database_stat = stat
+        self._entries = self._apply_journal(entries, self._dirty.items())
+
+    def refresh(self):
+        # Carga la caché, o la recarga si database.json cambió desde fuera
+        with self._cache_lock:
+            if self._entries is None:
+                self._get_entries()
+            else:
+                self._reload_if_changed()
+
+    def _mark_dirty(self, video_name, fields):
+        with self._cache_lock:
+            self._dirty.setdefault(video_name, {}).update(fields)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        with self._cache_lock:
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._cache_lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+
+                if not self._dirty:
+                    return True
+                self._reload_if_changed()
+                pending = {video_name: dict(fields) for video_name, fields in self._dirty.items()}
 
+            # El bloqueo de archivo puede tardar hasta LOCK_TIMEOUT (p. ej. mientras
+            # se compacta): se espera sin _cache_lock para no frenar a la interfaz
+            try:
+                self._ensure_dirs_exist()
+                self._append_journal(pending.items())
+            except Exception as e:
+                logger.error("Error saving video position: %s", e)
+                # Se reintenta más tarde en vez de esperar al próximo guardado
+                self._schedule_flush()
+                return False
+
+            with self._cache_lock:
+                # Lo que cambió durante la escritura sigue pendiente
+                for video_name, fields in pending.items():
+                    if self._dirty.get(video_name) == fields:
+                        del self._dirty[video_name]
+            return True
+
+    def _rotate_journal(self):
+        with self._journal_lock:
+            if self.pending_journal_path.exists():
+                return True
+            if self.journal_path.exists():
+                os.replace(self.journal_path, self.pending_journal_path)
+                return True
+        return False
+
+    def compact(self):
+        with self._compact_lock:
+            try:
+                # Lectura-modificación-escritura bajo bloqueo: se parte siempre del
+                # archivo actual en disco, así no se pierden entradas de otras
+                # instancias ni del tema (la última escritura de cada campo gana).
+                with self._database_lock():
+                    while self._rotate_journal():
+                        data = self._load_database(strict=True)
+                        self._apply_journal(data, self._read_journal(self.pending_journal_path))
+                        self._write_database(data)
+                        self.pending_journal_path.unlink()
+                return True
+            except Exception as e:
+                logger.error("Error compacting position journal: %s", e)
+                return False
+
+    def _compact_in_background(self):
+        if self._compact_thread and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compact_thread.start()
+
+    def close(self):
+        self.flush()
+        if self._compact_thread and self._compact_thread.is_alive():
+            self._compact_thread.join()
+        return self.compact()
+
+    def close_async(self, on_closed=None):
+        # close() puede esperar segundos por el bloqueo (p. ej. si el tema lo
+        # tiene): se hace en un hilo propio. No es daemon, así que el proceso
+        # no termina hasta que los cambios estén en disco.
+        def run():
+            saved = self.close()
+            if on_closed:
+                on_closed(saved)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def _update_entry(self, video_name, fields):
+        # Cambia solo los campos indicados (None los borra) y conserva el
+        # resto de la entrada; sin campos, la entrada desaparece. Al journal
+        # va solo lo que cambió, no la entrada completa.
+        with self._cache_lock:
+            data = self._get_entries()
+            current = data.get(video_name)
+            current = current if isinstance(current, dict) else {}
+            changes = {}
+            for key, field in fields.items():
+                if field is None:
+                    if key in current:
+                        changes[key] = None
+                elif current.get(key) != field:
+                    changes[key] = field
+
+            if not changes:
+                return
+            self._apply_journal(data, [(video_name, changes)])
+            self._mark_dirty(video_name, changes)
+
+    def save_video_position(self, video_name, position_ms):
+        try:
+            self._update_entry(video_name, {"x-lastPosition": position_ms})
             return True
         except Exception as e:
-            print(f"Error saving video position: {str(e)}")
+            logger.error("Error saving video position: %s", e)
             return False
 
-    def get_video_position(self, video_name):
+    def save_track_choices(self, video_name, choices):
+        try:
+            self._update_entry(video_name, {key: choices.get(key) for key in self.TRACK_CHOICE_KEYS})
+            return True
+        except Exception as e:
+            logger.error("Error saving track choices: %s", e)
+            return False
+
+    def get_track_choices(self, video_name):
         try:
-            if not self.database_path.exists():
-                return 0
+            entry = self._get_entries().get(video_name)
+            if not isinstance(entry, dict):
+                return {}
+            return {key: entry[key] for key in self.TRACK_CHOICE_KEYS if key in entry}
+        except Exception as e:
+            logger.error("Error al leer las pistas guardadas: %s", e)
+            return {}
 
-            with open(self.database_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+    def get_video_position(self, video_name):
+        try:
+            data = self._get_entries()
 
             if video_name in data:
                 position = data[video_name].get("x-lastPosition", 0)
                 return max(0, int(position)) if str(position).isdigit() else 0
             return 0
         except Exception as e:
-            print(f"Error al leer posición guardada: {str(e)}")
+            logger.error("Error al leer posición guardada: %s", e)
             return 0
 
     def remove_video_position(self, video_name):
+        # Las pistas elegidas se conservan para la próxima vez
         try:
-            if not self.database_path.exists():
-                return True
+            with self._cache_lock:
+                data = self._get_entries()
 
-            with open(self.database_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if video_name in data:
-                del data[video_name]
-                with open(self.database_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
-                return True
+                if video_name in data:
+                    self._update_entry(video_name, {"x-lastPosition": None})
+                    return True
             return False
         except Exception as e:
-            print(f"Error removing video position: {str(e)}")
+            logger.error("Error removing video position: %s", e)
             return False
 
     def get_system_info(self):
@@ -2,6 +2,10 @@ import os
 import sys
 import vlc
 import time
+import json
+import queue
+import hashlib
+import logging
 import tkinter as tk
 from tkinter import ttk
 import tkinter.font as tkfont
@@ -12,29 +16,344 @@ from PMDB_MP.progress import ProgressBar
 from PMDB_MP.pegasus_utils import PegasusUtils
 from PMDB_MP.subtitle_menu import SubtitleMenu
 from PMDB_MP.locales import get_locale
-import traceback
+from PMDB_MP.startup import StartupProfiler
 import ctypes
 from ctypes.util import find_library
 from PMDB_MP.gamepad import GamepadController
+from PMDB_MP.thumbnails import ThumbnailExtractor
+from PMDB_MP.vlc_profile import VlcProfile, ensure_plugin_cache
+from PMDB_MP.paths import get_cache_dir, file_identity, read_json_cache, write_json_cache
+from PMDB_MP.stats_overlay import StatsOverlay
+from PMDB_MP.theme import ThemeManager
+from PMDB_MP.subtitle_finder import SubtitleFinder
+from PMDB_MP.subtitle_cues import SubtitleCues
+from PMDB_MP.subtitle_encoding import SubtitleNormalizer
+from PMDB_MP.tracks import TrackCache, read_tracks, fourcc
+
+logger = logging.getLogger(__name__)
+
+# Despachador único de tareas periódicas sobre el bucle de Tk. Cada suscriptor
+# indica su periodo en ms (None = suspendido); solo hay un after() pendiente,
+# programado para el próximo vencimiento, y un callback que devuelve False se
+# da de baja solo.
+class FrameClock:
+
+    def __init__(self, root):
+        self.root = root
+        self._subscribers = {}
+        # Ticks de los suscriptores que ya se retiraron, para el informe
+        self._retired_ticks = {}
+        self._after_id = None
+        self._in_tick = False
+        self._stats_start = time.monotonic()
+
+    def register(self, name, callback, period_ms, delay_ms=None):
+        self._retire(name)
+        self._subscribers[name] = {
+            'callback': callback,
+            'period': period_ms,
+            'due': self._due_in(period_ms if delay_ms is None else delay_ms),
+            'ticks': 0
+        }
+        self._reschedule()
+
+    def unregister(self, name):
+        self._retire(name)
+        self._reschedule()
+
+    def _retire(self, name):
+        sub = self._subscribers.pop(name, None)
+        if sub and sub['ticks']:
+            self._retired_ticks[name] = self._retired_ticks.get(name, 0) + sub['ticks']
+
+    def set_period(self, name, period_ms, delay_ms=None):
+        sub = self._subscribers.get(name)
+        if not sub:
+            return
+        sub['period'] = period_ms
+        sub['due'] = self._due_in(period_ms if delay_ms is None else delay_ms)
+        self._reschedule()
+
+    def trigger(self, name):
+        sub = self._subscribers.get(name)
+        if sub:
+            sub['due'] = time.monotonic()
+            self._reschedule()
+
+    def get_stats(self):
+        elapsed = max(time.monotonic() - self._stats_start, 1e-6)
+        ticks = dict(self._retired_ticks)
+        for name, sub in self._subscribers.items():
+            ticks[name] = ticks.get(name, 0) + sub['ticks']
+        return {name: count / elapsed for name, count in ticks.items()}
+
+    def reset_stats(self):
+        self._stats_start = time.monotonic()
+        self._retired_ticks.clear()
+        for sub in self._subscribers.values():
+            sub['ticks'] = 0
+
+    def report_stats(self):
+        for name, rate in sorted(self.get_stats().items()):
+            logger.info("[CLOCK] %s: %.2f ticks/s", name, rate)
+
+    def stop(self):
+        for name in list(self._subscribers):
+            self._retire(name)
+        self._reschedule()
+
+    def _due_in(self, delay_ms):
+        return None if delay_ms is None else time.monotonic() + delay_ms / 1000
+
+    def _reschedule(self):
+        if self._in_tick:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+        pending = [sub['due'] for sub in self._subscribers.values() if sub['due'] is not None]
+        if pending:
+            delay = max(0, int((min(pending) - time.monotonic()) * 1000))
+            self._after_id = self.root.after(delay, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._in_tick = True
+        try:
+            now = time.monotonic()
+            for name, sub in list(self._subscribers.items()):
+                if sub['due'] is None or sub['due'] > now:
+                    continue
+                sub['ticks'] += 1
+                # El callback puede cambiar su propio periodo durante la llamada
+                sub['due'] = self._due_in(sub['period'])
+                try:
+                    result = sub['callback']()
+                except Exception as e:
+                    logger.exception("[CLOCK] Error en '%s': %s", name, e)
+                    result = None
+                # Solo si no se volvió a registrar con el mismo nombre durante la llamada
+                if result is False and self._subscribers.get(name) is sub:
+                    self._retire(name)
+        finally:
+            self._in_tick = False
+        self._reschedule()
+
+
+# Entrega al hilo de Tk las llamadas que llegan de otros hilos (eventos de
+# libvlc, gamepad, daemon, miniaturas). Los otros hilos solo encolan: una
+# llamada a Tk desde fuera de su hilo espera a que este la atienda, y si el
+# hilo de Tk está dentro de player.stop() esperando al de libvlc, ninguno
+# avanza. En Unix un pipe despierta al bucle de Tk (createfilehandler) solo
+# cuando hay algo en la cola; donde no existe, la cola se sondea con el reloj.
+class UiDispatcher:
+    POLL_MS = 20
+
+    def __init__(self, root, clock):
+        self.root = root
+        self._queue = queue.Queue()
+        self._pipe = None
+        pipe = None
+        try:
+            pipe = os.pipe()
+            for fd in pipe:
+                os.set_blocking(fd, False)
+            root.tk.createfilehandler(pipe[0], tk.READABLE, self._on_readable)
+            self._pipe = pipe
+        except (AttributeError, OSError, tk.TclError):
+            if pipe:
+                for fd in pipe:
+                    os.close(fd)
+            clock.register('ui_events', self.drain, self.POLL_MS)
+
+    def post(self, callback, *args):
+        # Se puede llamar desde cualquier hilo
+        self._queue.put((callback, args))
+        pipe = self._pipe
+        if pipe:
+            try:
+                os.write(pipe[1], b'\0')
+            except OSError:
+                # Pipe lleno (ya hay un aviso pendiente) o ya cerrado
+                pass
+
+    def _on_readable(self, fd, mask):
+        try:
+            while os.read(fd, 4096):
+                pass
+        except OSError:
+            pass
+        self.drain()
+
+    def drain(self):
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.exception("[UI] Error atendiendo %s: %s", callback, e)
+
+    def close(self):
+        pipe, self._pipe = self._pipe, None
+        if pipe:
+            try:
+                self.root.tk.deletefilehandler(pipe[0])
+            except tk.TclError:
+                pass
+            for fd in pipe:
+                os.close(fd)
+
+
+# Elige el decodificador de video: prueba primero los de hardware de la
+# plataforma y pasa al siguiente si se pierden imágenes durante los primeros
+# segundos. La elección se recuerda por códec y resolución (y cada archivo
+# recuerda su formato, para acertar antes de play() en el siguiente arranque).
+class DecoderStrategy:
+    CANDIDATES = {
+        'linux': ['vaapi', 'vdpau'],
+        'win32': ['d3d11va', 'dxva2']
+    }
+    # Fracción de imágenes perdidas a partir de la cual se cambia de decodificador
+    DROP_THRESHOLD = 0.05
+    # Imágenes necesarias para juzgar un decodificador (~5 s a 24 fps)
+    MIN_PICTURES = 120
+    MAX_FILES = 500
+
+    def __init__(self):
+        self.candidates = self.CANDIDATES.get(sys.platform, []) + ['none']
+        self.cache_path = get_cache_dir() / 'decoders.json'
+        self._cache = self._read_cache()
+        self.current = None
+        self.key = None
+        self._identity = None
+        self._ratios = {}
+        self._baseline = None
+
+    def _read_cache(self):
+        cache = read_json_cache(self.cache_path)
+        cache.setdefault('formats', {})
+        cache.setdefault('files', {})
+        return cache
+
+    def _write_cache(self):
+        try:
+            write_json_cache(self.cache_path, self._cache, indent=4)
+        except OSError as e:
+            logger.warning("[DECODER] No se pudo guardar la elección de decodificador: %s", e)
+
+    def start(self, video_path):
+        # Decodificador para un video nuevo: el recordado para su formato o el primero
+        self._identity = file_identity(video_path)
+        self.key = self._cache['files'].get(self._identity)
+        self._ratios = {}
+        self._baseline = None
+        remembered = self._cache['formats'].get(self.key)
+        self.current = remembered if remembered in self.candidates else self.candidates[0]
+        return self.current
+
+    def identify(self, codec, width, height):
+        # Devuelve el decodificador recordado para el formato si no es el actual
+        key = f"{codec}|{width}x{height}"
+        if key != self.key:
+            self.key = key
+            if self._identity:
+                files = self._cache['files']
+                files.pop(self._identity, None)
+                files[self._identity] = key
+                while len(files) > self.MAX_FILES:
+                    files.pop(next(iter(files)))
+                self._write_cache()
+
+        remembered = self._cache['formats'].get(key)
+        if remembered in self.candidates and remembered != self.current and remembered not in self._ratios:
+            return remembered
+        return None
+
+    def switch(self, decoder):
+        self.current = decoder
+        self._baseline = None
+
+    def check(self, displayed, lost):
+        # None mientras faltan imágenes; True si el decodificador actual sirve
+        if self._baseline is None:
+            self._baseline = (displayed, lost)
+            return None
+
+        shown = displayed - self._baseline[0]
+        dropped = lost - self._baseline[1]
+        if shown + dropped < self.MIN_PICTURES:
+            return None
+
+        ratio = dropped / (shown + dropped)
+        self._ratios[self.current] = ratio
+        logger.info("[DECODER] %s: %d de %d imágenes perdidas (%.1f%%)", self.current, dropped, shown + dropped, ratio * 100)
+        if ratio <= self.DROP_THRESHOLD:
+            self.remember(self.current)
+            return True
+        return False
+
+    def next_decoder(self):
+        # Siguiente candidato sin probar; si ya se probaron todos, el que menos perdió
+        for decoder in self.candidates:
+            if decoder not in self._ratios:
+                return decoder
+
+        best = min(self._ratios, key=self._ratios.get)
+        self.remember(best)
+        return best if best != self.current else None
+
+    def remember(self, decoder):
+        if self.key and self._cache['formats'].get(self.key) != decoder:
+            self._cache['formats'][self.key] = decoder
+            self._write_cache()
+
 
 class VideoPlayer:
-    def __init__(self, video_path, language='es'):
+    def __init__(self, video_path=None, language='es', gamepad='auto', profiler=None, resident=False,
+                 vlc_profile=None, stats_log=None, hide_cursor=False):
+        # Arranque por etapas: primero ventana y VLC para que empiece a
+        # decodificar cuanto antes; controles y tema se construyen mientras
+        # VLC prepara el primer fotograma, y la base de datos se consulta en
+        # paralelo desde el principio.
+        # Sin video_path se construye solo la ventana (oculta) y VLC, a la
+        # espera de open(); con resident=True cerrar un video termina la
+        # sesión pero conserva la ventana, VLC y el gamepad.
+        self.profiler = profiler or StartupProfiler()
+        self.profiler.mark("importaciones")
+        self.resident = resident
+        self.hide_cursor = hide_cursor
+        self.vlc_profile = vlc_profile or VlcProfile()
+        # Un decodificador elegido a mano en el perfil desactiva la selección automática
+        forced_decoder = self.vlc_profile.settings.get('avcodec-hw', 'any')
+        self.decoder = DecoderStrategy() if forced_decoder == 'any' else None
+        self.video_path = None
+        self.video_name = None
+        self.on_session_end = None
+        self._start_database_lookup()
+
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
-        from PMDB_MP.locales import get_locale
+        self.language = language
         self.locale = get_locale(language)
-        video_name = os.path.basename(video_path)
         self.bg_color = "#202227"
         self.bg_color2 = "black"
         self.btn_color = "#303338"
         self.progress_color = "#50555f"
         self.empty_bar_color = "#383838"
         self.root = ctk.CTk()
-        self.root.title(self.locale["player_title"].format(video_name))
+        if video_path is None:
+            self.root.withdraw()
         self.root.geometry("800x600")
         self.root.minsize(600,400)
+        self.clock = FrameClock(self.root)
+        self.dispatcher = UiDispatcher(self.root, self.clock)
+        self.theme = ThemeManager()
         self.gamepad = None
-        self.init_gamepad()
+        self.gamepad_mode = gamepad
         try:
             base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             icon_path = os.path.join(base_path, "assets", "icons", "pmdbmp.png")
@@ -46,8 +365,7 @@ class VideoPlayer:
                     icon = tk.PhotoImage(file=icon_path)
                     self.root.iconphoto(True, icon)
         except Exception as e:
-            print(f"No se pudo cargar el icono: {str(e)}")
-        self.root.update()
+            logger.warning("No se pudo cargar el icono: %s", e)
         self.controls_visible = True
         self.video_frame = tk.Frame(self.root, bg=self.bg_color2)
         self.video_frame.pack(fill=tk.BOTH, expand=True)
@@ -58,43 +376,40 @@ class VideoPlayer:
         self.progress = ProgressBar(self.progress_frame)
         self.progress.pack(fill=tk.X)
         self.progress.set_seek_callback(self._seek_video)
+        self._pending_seek = None
+        self._seek_in_flight_id = None
+        self._fast_seek_supported = True
         self.button_frame = ctk.CTkFrame(self.control_frame)
         self.button_frame.pack(fill=tk.X, padx=10, pady=(0, 5))
         self.is_fullscreen = False
         self.original_geometry = self.root.geometry()
-        self._setup_vlc(video_path)
-        self.subtitle_path = self._find_subtitle_file(video_path)
-        self.subtitle_enabled = False
-
-        print(f"[INIT] ¿Subtítulo encontrado?: {self.subtitle_path is not None}")
-        print(f"[INIT] Estado inicial de subtítulo: {self.subtitle_enabled}")
-
-        # Agregar esto después de encontrar el archivo de subtítulos:
-        if self.subtitle_path:
-            print(f"[INIT] Subtítulo externo encontrado: {self.subtitle_path}")
-            try:
-                # Cargar pero no activar el subtítulo externo
-                result = self.player.video_set_subtitle_file(self.subtitle_path)
-                print(f"[INIT] Resultado de cargar subtítulo externo: {result}")
-                self.player.video_set_spu(-1)  # Desactivar inicialmente
-                print(f"[INIT] Subtítulo externo cargado pero desactivado")
-
-                # Asegurar que el estado inicial sea correcto
-                self.subtitle_enabled = False
-
-            except Exception as e:
-                print(f"[INIT] Error al cargar subtítulo externo: {e}")
-                self.subtitle_path = None
-        else:
-            print("[INIT] No se encontró subtítulo externo")
-
-        # Al final del __init__, después de crear los controles:
-        # Actualizar UI inicial para mostrar disponibilidad de subtítulos
-        self._update_subtitle_ui_state()
+        self.thumbnails = None
+        self.profiler.mark("ventana")
 
-        self.player.video_set_spu(-1)
+        self.is_playing = False
+        self.media = None
+        self.media_ready = False
+        self.total_time = 0
+        self._setup_vlc()
+        self._setup_player_events()
+        self.profiler.mark("vlc")
+
+        self.subtitle_finder = SubtitleFinder()
+        self.subtitle_normalizer = SubtitleNormalizer()
+        self.track_cache = TrackCache()
+        self.media_tracks = None
+        self.current_audio_track = None
+        self._restore_external_subtitle = False
+        self.subtitle_path = None
+        self.subtitle_cues = None
+        self.skip_silence = False
+        self._last_search = None
+        self.subtitle_enabled = False
         self.embedded_subtitles = []
         self.current_embedded_sub = -1
+        if video_path:
+            self._open_media(video_path)
+
         self.controls = PlayerControls(
             self.button_frame,
             play_pause_cmd=self.toggle_play_pause,
@@ -105,35 +420,23 @@ class VideoPlayer:
             toggle_fullscreen_cmd=self._toggle_fullscreen,
             toggle_subtitle_cmd=self._toggle_subtitle,
             show_subtitle_menu_cmd=self._show_subtitle_menu,
+            show_audio_menu_cmd=self._show_audio_menu,
             locale=self.locale
         )
 
         has_subtitle = self.subtitle_path is not None
         self.controls.set_subtitle_state(has_subtitle, self.subtitle_enabled)
-        if has_subtitle:
+        if has_subtitle and not self.subtitle_enabled:
             self.player.video_set_spu(-1)
+        if self.media_tracks:
+            self._publish_tracks(self.media_tracks)
 
         self.controls.set_volume_change_callback(self._on_volume_change)
         self.controls.pack(fill=tk.X)
+        self.stats = StatsOverlay(self, log_path=stats_log)
+        if self.video_path:
+            self.stats.start()
 
-        events = self.media.event_manager()
-        events.event_attach(vlc.EventType.MediaParsedChanged, self.on_media_parsed)
-
-        self.player.set_media(self.media)
-        self.player.video_set_scale(0)
-
-        if sys.platform == "linux":
-            self.root.update_idletasks()
-            x_window_id = self.video_frame.winfo_id()
-            self.player.set_xwindow(x_window_id)
-        elif sys.platform == "win32":
-            self.player.set_hwnd(self.video_frame.winfo_id())
-        elif sys.platform == "darwin":
-            self.player.set_nsobject(self.video_frame.winfo_id())
-
-        self.is_playing = False
-        self.media_ready = False
-        self.total_time = 0
         self.root.protocol("WM_DELETE_WINDOW", self.close_player)
         self.root.bind("<Escape>", self._exit_fullscreen_or_close)
         self.root.bind("<F11>", lambda e: self._toggle_fullscreen())
@@ -142,6 +445,14 @@ class VideoPlayer:
         self.root.bind("<space>", self._handle_play_pause)
         self.root.bind("<Up>", self._handle_volume_up)
         self.root.bind("<Down>", self._handle_volume_down)
+        self.root.bind("<i>", lambda e: self.stats.toggle())
+        self.root.bind("<s>", self._handle_skip_silence)
+        self.root.bind("<Control-f>", self._handle_search_subtitles)
+        self.root.bind("<F3>", self._handle_search_next)
+        for widget in (self.root, self.video_frame):
+            # Más específicas que <Left>/<Right>, también con el foco en el video
+            widget.bind("<Control-Left>", self._handle_previous_line)
+            widget.bind("<Control-Right>", self._handle_next_line)
         self.video_frame.bind("<Left>", self._handle_rewind)
         self.video_frame.bind("<Right>", self._handle_forward)
         self.video_frame.bind("<space>", self._handle_play_pause)
@@ -149,40 +460,30 @@ class VideoPlayer:
         self.video_frame.bind("<Down>", self._handle_volume_down)
         self.video_frame.bind("<Button-1>", lambda e: self.video_frame.focus_set())
         self.video_frame.bind("<Double-Button-1>", lambda e: self._toggle_fullscreen())
-        self._start_player_thread()
-        self.root.after(1000, self._refresh_duration)
-        self.root.after(100, self.update_ui)
+        self.clock.register('ui', self.update_ui, None)
+        self.root.bind("<Map>", lambda e: self._schedule_ui_update(), add="+")
         self._init_fullscreen_controls()
         self.player.audio_set_volume(50)
-        self.root.update()
-
-        self.control_frame.configure(
-            fg_color=self.bg_color,
-            bg_color=self.bg_color,
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.progress_frame.configure(
-            fg_color=self.bg_color,
-            bg_color=self.bg_color,
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.button_frame.configure(
-            fg_color=self.bg_color,
-            bg_color=self.bg_color,
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.progress.configure(
-            fg_color=self.bg_color,
-            bg_color=self.bg_color
-        )
+        self.profiler.mark("controles")
 
-        self.progress.progress_slider.configure(
+        self._apply_theme()
+        self._setup_save_events()
+        self.profiler.mark("tema")
+
+    def _apply_theme(self):
+        # Solo se envían a cada widget las opciones que cambian
+        panel = {
+            'fg_color': self.bg_color,
+            'bg_color': self.bg_color,
+            'corner_radius': 0,
+            'border_width': 0
+        }
+        for frame in (self.control_frame, self.progress_frame, self.button_frame, self.controls):
+            self.theme.apply(frame, **panel)
+
+        self.theme.apply(self.progress, fg_color=self.bg_color, bg_color=self.bg_color)
+        self.theme.apply(
+            self.progress.progress_slider,
             fg_color=self.empty_bar_color,
             progress_color=self.progress_color,
             button_color="#b1bacc",
@@ -190,74 +491,293 @@ class VideoPlayer:
             border_width=0,
             corner_radius=5
         )
-
-        self.progress.time_label.configure(
+        self.theme.apply(
+            self.progress.time_label,
             fg_color=self.bg_color,
             bg_color=self.bg_color,
             text_color="white"
         )
 
-        self.controls.configure(
-            fg_color=self.bg_color,
+        for widget in self.controls.winfo_children():
+            if isinstance(widget, ctk.CTkButton):
+                self.theme.apply(
+                    widget,
+                    fg_color=self.btn_color,
+                    bg_color=self.bg_color,
+                    hover_color="#404348",
+                    text_color="white",
+                    corner_radius=5
+                )
+            elif widget is not self.controls.volume_slider:
+                self.theme.apply(widget, fg_color=self.bg_color, bg_color=self.bg_color)
+
+        self.theme.apply(
+            self.controls.volume_slider,
+            fg_color=self.empty_bar_color,
             bg_color=self.bg_color,
-            corner_radius=0,
-            border_width=0
+            button_color=self.progress_color,
+            button_hover_color="#60656f",
+            progress_color=self.progress_color
         )
 
-        for widget in self.controls.winfo_children():
-            if isinstance(widget, ctk.CTkButton):
-                try:
-                    widget.configure(
-                        fg_color=self.btn_color,
-                        bg_color=self.bg_color,
-                        hover_color="#404348",
-                        text_color="white",
-                        corner_radius=5
-                    )
-                except Exception as e:
-                    print(f"Error configurando botón: {e}")
-            else:
-                try:
-                    widget.configure(
-                        fg_color=self.bg_color,
-                        bg_color=self.bg_color
-                    )
-                except Exception as e:
-                    print(f"Error configurando widget: {e}")
+    def _open_media(self, video_path):
+        self.video_path = video_path
+        self.video_name = os.path.splitext(os.path.basename(video_path))[0]
+        self.root.title(self.locale["player_title"].format(os.path.basename(video_path)))
+        self.is_playing = False
+        self.media_ready = False
+        self.total_time = 0
+        self._playback_started = False
+        self._restart_paused = False
+        self._format_pending = True
+        if self.decoder:
+            decoder = self.decoder.start(video_path)
+            logger.debug("[DECODER] Decodificador inicial: %s", decoder)
+        self._load_media(video_path)
+        self.clock.register('duration', self._refresh_duration, 1000)
 
-        try:
-            self.controls.volume_slider.configure(
-                fg_color=self.empty_bar_color,
-                bg_color=self.bg_color,
-                button_color=self.progress_color,
-                button_hover_color="#60656f",
-                progress_color=self.progress_color
-            )
-        except Exception as e:
-            print(f"Error configurando volumen: {e}")
+        self.subtitle_path = self._find_subtitle_file(video_path)
+        self.subtitle_enabled = False
 
+        logger.debug("[INIT] ¿Subtítulo encontrado?: %s", self.subtitle_path is not None)
+        logger.debug("[INIT] Estado inicial de subtítulo: %s", self.subtitle_enabled)
+
+        # Agregar esto después de encontrar el archivo de subtítulos:
+        if self.subtitle_path:
+            logger.debug("[INIT] Subtítulo externo encontrado: %s", self.subtitle_path)
+            try:
+                # Cargar pero no activar el subtítulo externo
+                result = self.player.video_set_subtitle_file(self.subtitle_path)
+                logger.debug("[INIT] Resultado de cargar subtítulo externo: %s", result)
+                self.player.video_set_spu(-1)  # Desactivar inicialmente
+                logger.debug("[INIT] Subtítulo externo cargado pero desactivado")
+
+                # Asegurar que el estado inicial sea correcto
+                self.subtitle_enabled = False
+
+            except Exception as e:
+                logger.error("[INIT] Error al cargar subtítulo externo: %s", e)
+                self.subtitle_path = None
+        else:
+            logger.debug("[INIT] No se encontró subtítulo externo")
+
+        # El índice de diálogos se construye después del arranque (o al usarlo)
+        if self.subtitle_path and SubtitleCues.supports(self.subtitle_path):
+            self.subtitle_cues = SubtitleCues(self.subtitle_path)
+        else:
+            self.subtitle_cues = None
+
+        # Al final del __init__, después de crear los controles:
+        # Actualizar UI inicial para mostrar disponibilidad de subtítulos
+        self._update_subtitle_ui_state()
+
+        self.player.video_set_spu(-1)
+        self.embedded_subtitles = []
+        self.media_tracks = None
+        self.current_embedded_sub = -1
+        self.current_audio_track = None
+        self._restore_external_subtitle = False
+        # Pistas de una apertura anterior del mismo archivo, sin esperar al análisis
+        cached_tracks = self.track_cache.get(video_path)
+        if cached_tracks:
+            self._publish_tracks(cached_tracks)
+        self.profiler.mark("subtítulos")
+
+        self._apply_saved_start_time()
+        self._start_player()
+        self.profiler.mark("play")
         if self.subtitle_path:
             self.root.after(1000, self._ensure_subtitles_off)
-        self.pegasus_utils = PegasusUtils()
-        self.video_name = os.path.splitext(os.path.basename(video_path))[0]
-        self._setup_save_events()
-        self.saved_position = self.pegasus_utils.get_video_position(self.video_name)
+
+    def open(self, video_path, fullscreen=False, on_finished=None):
+        # Nueva sesión sobre la ventana y la instancia de VLC ya creadas;
+        # on_finished(resultado) se llama cuando el video se cierra o termina.
+        self.profiler = StartupProfiler(enabled=self.profiler.enabled)
+        self.on_session_end = on_finished
+        self._open_media(video_path)
+        self.stats.start()
+        self._update_subtitle_ui_state()
+        self.controls.update_play_pause_button(True)
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+        if fullscreen and not self.is_fullscreen:
+            self.root.after(100, self._toggle_fullscreen)
+
+    def shutdown(self):
+        # Cierre completo también en modo residente
+        self.resident = False
+        self.close_player()
+
+    # Espera máxima por la consulta de la base de datos antes de play() (s)
+    DATABASE_WAIT = 0.05
+
+    def _start_database_lookup(self):
+        self.pegasus_utils = None
+        self.saved_position = 0
+        self._database_thread = Thread(target=self._load_database, daemon=True)
+        self._database_thread.start()
+
+    def _load_database(self):
+        started = time.perf_counter()
+        try:
+            self.pegasus_utils = PegasusUtils()
+            self.pegasus_utils.refresh()
+        except Exception as e:
+            logger.error("Error al abrir la base de datos de Pegasus: %s", e)
+        self.profiler.record("base de datos", (time.perf_counter() - started) * 1000)
+
+    def _get_pegasus_utils(self):
+        self._database_thread.join()
+        return self.pegasus_utils
+
+    def _lookup_saved_position(self):
+        if not self.pegasus_utils:
+            return 0
+        # En modo residente el tema puede haber cambiado database.json entre sesiones
+        self.pegasus_utils.refresh()
+        return self.pegasus_utils.get_video_position(self.video_name)
+
+    def _apply_saved_start_time(self):
+        # Si la consulta ya terminó, VLC arranca directamente en la posición
+        # guardada; si no, se salta a ella cuando llegue el resultado.
+        self.saved_position = 0
+        self._database_thread.join(timeout=self.DATABASE_WAIT)
+        if self._database_thread.is_alive():
+            self.root.after(100, self._wait_for_saved_position)
+            return
+
+        self.saved_position = self._lookup_saved_position()
         if self.saved_position > 0:
-            print(f"Posición guardada encontrada: {self.saved_position}ms")
-            self.root.after(1000, lambda: self._seek_to_saved_position())
+            logger.info("Posición guardada encontrada: %sms", self.saved_position)
+            self.media.add_option(f":start-time={self.saved_position / 1000:.3f}")
+        self._apply_saved_tracks(before_play=True)
 
-        def _load_saved_position(self):
-            if self.saved_position > 0 and self.media_ready:
-                self.player.set_time(self.saved_position)
-                self.update_ui()
+    def _wait_for_saved_position(self):
+        if self._database_thread.is_alive():
+            self.root.after(100, self._wait_for_saved_position)
+            return
+
+        self.saved_position = self._lookup_saved_position()
+        if self.saved_position > 0:
+            logger.info("Posición guardada encontrada: %sms", self.saved_position)
+            self._seek_to_saved_position()
+        self._apply_saved_tracks(before_play=False)
+
+    def _apply_saved_tracks(self, before_play):
+        # Con la consulta a tiempo las pistas van como opciones del media y
+        # VLC arranca ya con el idioma elegido; si llega tarde se cambian en marcha
+        if not self.pegasus_utils:
+            return
+        choices = self.pegasus_utils.get_track_choices(self.video_name)
+        if not choices:
+            return
+
+        audio_id = self._resolve_saved_track(choices, 'audio', 'x-audioTrack', 'x-audioLanguage')
+        if audio_id is not None:
+            self.current_audio_track = audio_id
+            if before_play:
+                self.media.add_option(f":audio-track-id={audio_id}")
+            else:
+                self.player.audio_set_track(audio_id)
+
+        if choices.get('x-subtitleTrack') == 'external':
+            if self.subtitle_path:
+                self._restore_external_subtitle = True
+                if not before_play and self._playback_started:
+                    self._restore_saved_external_subtitle()
+            return
+
+        subtitle_id = self._resolve_saved_track(choices, 'subtitles', 'x-subtitleTrack', 'x-subtitleLanguage')
+        if subtitle_id is not None and subtitle_id != -1:
+            self.subtitle_enabled = True
+            self.current_embedded_sub = subtitle_id
+            if before_play:
+                self.media.add_option(f":sub-track-id={subtitle_id}")
+            else:
+                self.player.video_set_spu(subtitle_id)
+                self._update_subtitle_ui_state()
+        logger.debug("[TRACKS] Pistas guardadas: %s -> audio %s, subtítulo %s", choices, audio_id, subtitle_id)
+
+    def _resolve_saved_track(self, choices, kind, id_key, language_key):
+        # El id vale si la pista sigue existiendo con el mismo idioma; si el
+        # archivo cambió (p. ej. otro remux) se busca por idioma
+        track_id = choices.get(id_key)
+        language = choices.get(language_key)
+        if not isinstance(track_id, int):
+            return None
+        tracks = self.media_tracks[kind] if self.media_tracks else None
+        if not tracks or track_id == -1:
+            return track_id
+
+        for track in tracks:
+            if track['id'] == track_id and (not language or track['language'] == language):
+                return track_id
+        for track in tracks:
+            if language and track['language'] == language:
+                return track['id']
+        return None
+
+    def _restore_saved_external_subtitle(self):
+        self._restore_external_subtitle = False
+        if self.subtitle_path and not self.subtitle_enabled:
+            self._toggle_subtitle()
+
+    def _remember_track_choices(self):
+        if not self.pegasus_utils or not self.video_name:
+            return
+
+        choices = {}
+        audio = self._find_track('audio', self.current_audio_track)
+        if self.current_audio_track is not None:
+            choices['x-audioTrack'] = self.current_audio_track
+            choices['x-audioLanguage'] = audio['language'] if audio else None
+
+        if not self.subtitle_enabled:
+            choices['x-subtitleTrack'] = -1
+        elif self.current_embedded_sub == -1:
+            choices['x-subtitleTrack'] = 'external'
+        else:
+            subtitle = self._find_track('subtitles', self.current_embedded_sub)
+            choices['x-subtitleTrack'] = self.current_embedded_sub
+            choices['x-subtitleLanguage'] = subtitle['language'] if subtitle else None
+        self.pegasus_utils.save_track_choices(self.video_name, choices)
+
+    def _find_track(self, kind, track_id):
+        for track in (self.media_tracks or {}).get(kind, []):
+            if track['id'] == track_id:
+                return track
+        return None
+
+    # Con --gamepad auto y sin mandos, cada cuánto se mira si se conectó uno (ms)
+    GAMEPAD_PROBE_MS = 3000
 
     def init_gamepad(self):
+        if self.gamepad or self.gamepad_mode == 'off':
+            return
+        if self.gamepad_mode == 'auto' and not GamepadController.input_devices_present():
+            # SDL no se carga hasta que aparezca un mando en /dev/input
+            logger.info("No se detectaron mandos, se esperará a que se conecte uno")
+            self.clock.register('gamepad_probe', self._probe_gamepad, self.GAMEPAD_PROBE_MS)
+            return
+        self._start_gamepad()
+
+    def _probe_gamepad(self):
+        if self.gamepad:
+            return False
+        if not GamepadController.input_devices_present():
+            return None
+        logger.info("Mando detectado, iniciando gamepad")
+        self._start_gamepad()
+        return False
+
+    def _start_gamepad(self):
         try:
             from PMDB_MP.gamepad import GamepadController
             self.gamepad = GamepadController(self)
             self.gamepad.start()
         except Exception as e:
-            print(f"Error inicializando gamepad: {str(e)}")
+            logger.error("Error inicializando gamepad: %s", e)
 
     def _seek_relative(self, ms):
         if hasattr(self, 'player') and self.player:
@@ -266,121 +786,75 @@ class VideoPlayer:
             self.player.set_time(new_time)
             self._save_position_after_action()
 
-    def close_player(self):
-        try:
-            if hasattr(self, 'gamepad') and self.gamepad:
-                try:
-                    self.gamepad.stop()
-                except Exception as e:
-                    print(f"Error deteniendo gamepad: {str(e)}")
-
-            if hasattr(self, 'player') and self.player:
-                try:
-                    player_state = self.player.get_state()
-                    if player_state != vlc.State.Ended:
-                        current_pos = self.player.get_time()
-                        if current_pos > 0:
-                            self.pegasus_utils.save_video_position(self.video_name, current_pos)
-                            print(f"Posición final guardada: {current_pos}ms")
-                    else:
-                        print("Video terminado, no se guarda posición")
-
-                    self.player.stop()
-                    self.is_playing = False
-                    timeout = time.time() + 0.5
-                    while self.player.get_state() != vlc.State.Stopped and time.time() < timeout:
-                        time.sleep(0.05)
-
-                    self.player.release()
-                    print("Reproductor VLC liberado correctamente")
-                except Exception as e:
-                    print(f"Error al detener el reproductor VLC: {e}")
-
-            if hasattr(self, 'instance') and self.instance:
-                try:
-                    self.instance.release()
-                    print("Instancia VLC liberada correctamente")
-                except Exception as e:
-                    print(f"Error al liberar la instancia VLC: {e}")
-
-        except Exception as e:
-            print(f"Error inesperado al cerrar el reproductor: {e}")
-            traceback.print_exc()
-
-        if hasattr(self, 'root'):
-            try:
-                if not self.is_fullscreen:
-                    self.original_geometry = self.root.geometry()
-
-                self.root.quit()
-                self.root.destroy()
-                print("Interfaz gráfica cerrada correctamente")
-            except Exception as e:
-                print(f"Error al cerrar la ventana: {e}")
-
     def _ensure_subtitles_off(self):
-        print("[ENSURE_OFF] Comprobando estado de subtítulos")
+        logger.debug("[ENSURE_OFF] Comprobando estado de subtítulos")
         current_spu = self.player.video_get_spu()
-        print(f"[ENSURE_OFF] Estado actual: {current_spu}")
+        logger.debug("[ENSURE_OFF] Estado actual: %s", current_spu)
 
         if current_spu != -1 and not self.subtitle_enabled:
-            print("[ENSURE_OFF] Subtítulos activados cuando no deberían. Desactivando...")
+            logger.debug("[ENSURE_OFF] Subtítulos activados cuando no deberían. Desactivando...")
             self.player.video_set_spu(-1)
-            print(f"[ENSURE_OFF] Nuevo estado: {self.player.video_get_spu()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[ENSURE_OFF] Nuevo estado: %s", self.player.video_get_spu())
 
     def _find_subtitle_file(self, video_path):
-        base_path = os.path.splitext(video_path)[0]
-        subtitle_extensions = ['.srt', '.sub', '.ass', '.vtt']
-
-        for ext in subtitle_extensions:
-            subtitle_path = f"{base_path}{ext}"
-            print(f"[FIND_SUB] Buscando: {subtitle_path}")
-            if os.path.exists(subtitle_path):
-                print(f"[FIND_SUB] Encontrado: {subtitle_path}")
-                return subtitle_path
-
-        print("[FIND_SUB] No se encontró archivo de subtítulos")
+        # Candidatos ordenados: primero el idioma de la interfaz y los completos
+        candidates = self.subtitle_finder.find(video_path, self.language)
+        # Un nombre solo parecido no se carga solo: podría ser otra película
+        strong = [candidate for candidate in candidates if not candidate['fuzzy']]
+        if strong:
+            subtitle_path = strong[0]['path']
+            logger.debug("[FIND_SUB] Encontrado: %s", subtitle_path)
+            # libvlc recibe siempre UTF-8 (copia en caché si hace falta)
+            return self.subtitle_normalizer.normalize(subtitle_path)
+
+        for candidate in candidates:
+            logger.info("[FIND_SUB] Subtítulo con nombre parecido, no se carga: %s", candidate['path'])
+        logger.debug("[FIND_SUB] No se encontró archivo de subtítulos")
         return None
 
     def _toggle_subtitle(self):
-        print(f"[TOGGLE] Estado actual antes de toggle: {self.subtitle_enabled}")
-        print(f"[TOGGLE] SPU actual antes de toggle: {self.player.video_get_spu()}")
-        print(f"[TOGGLE] Subtítulo embebido actual: {self.current_embedded_sub}")
-        print(f"[TOGGLE] Subtítulo externo disponible: {bool(self.subtitle_path)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[TOGGLE] Estado actual antes de toggle: %s", self.subtitle_enabled)
+            logger.debug("[TOGGLE] SPU actual antes de toggle: %s", self.player.video_get_spu())
+            logger.debug("[TOGGLE] Subtítulo embebido actual: %s", self.current_embedded_sub)
+            logger.debug("[TOGGLE] Subtítulo externo disponible: %s", bool(self.subtitle_path))
 
         self.subtitle_enabled = not self.subtitle_enabled
-        print(f"[TOGGLE] Nuevo estado después de toggle: {self.subtitle_enabled}")
+        logger.debug("[TOGGLE] Nuevo estado después de toggle: %s", self.subtitle_enabled)
 
         if self.subtitle_enabled:
             if self.subtitle_path:
-                print(f"[TOGGLE] Activando subtítulo externo: {self.subtitle_path}")
+                logger.debug("[TOGGLE] Activando subtítulo externo: %s", self.subtitle_path)
                 try:
                     result = self.player.video_set_subtitle_file(self.subtitle_path)
-                    print(f"[TOGGLE] Resultado de cargar subtítulo externo: {result}")
+                    logger.debug("[TOGGLE] Resultado de cargar subtítulo externo: %s", result)
                     self.player.video_set_spu(0)
                     self.current_embedded_sub = -1
                 except Exception as e:
-                    print(f"[TOGGLE] Error al cargar subtítulo externo: {e}")
+                    logger.error("[TOGGLE] Error al cargar subtítulo externo: %s", e)
                     self.subtitle_enabled = False
 
             elif self.current_embedded_sub != -1:
-                print(f"[TOGGLE] Activando subtítulo embebido ID: {self.current_embedded_sub}")
+                logger.debug("[TOGGLE] Activando subtítulo embebido ID: %s", self.current_embedded_sub)
                 self.player.video_set_spu(self.current_embedded_sub)
             elif self.embedded_subtitles:
                 first_sub_id = self.embedded_subtitles[0]["id"]
-                print(f"[TOGGLE] Activando primer subtítulo embebido disponible: {first_sub_id}")
+                logger.debug("[TOGGLE] Activando primer subtítulo embebido disponible: %s", first_sub_id)
                 self.player.video_set_spu(first_sub_id)
                 self.current_embedded_sub = first_sub_id
             else:
-                print("[TOGGLE] No hay subtítulos disponibles")
+                logger.debug("[TOGGLE] No hay subtítulos disponibles")
                 self.subtitle_enabled = False
         else:
-            print("[TOGGLE] Desactivando todos los subtítulos")
+            logger.debug("[TOGGLE] Desactivando todos los subtítulos")
             self.player.video_set_spu(-1)
 
         final_spu = self.player.video_get_spu()
-        print(f"[TOGGLE] SPU después de toggle: {final_spu}")
-        print(f"[TOGGLE] Estado final subtítulos: {'ACTIVO' if final_spu != -1 else 'INACTIVO'}")
+        logger.debug("[TOGGLE] SPU después de toggle: %s", final_spu)
+        self._mark_event('subtitle', spu=final_spu)
+        self._remember_track_choices()
+        logger.debug("[TOGGLE] Estado final subtítulos: %s", 'ACTIVO' if final_spu != -1 else 'INACTIVO')
 
         self._update_subtitle_ui_state()
 
@@ -401,107 +875,55 @@ class VideoPlayer:
             self._toggle_mute()
 
     def _toggle_fullscreen(self):
+        self._measure_lost_pictures('fullscreen_lost')
         if self.is_fullscreen:
             self._exit_fullscreen()
         else:
             self._enter_fullscreen()
         self.controls.update_fullscreen_button(self.is_fullscreen)
+        self._mark_event('fullscreen', enabled=self.is_fullscreen)
+
+    # Tiempo tras el cambio en el que se cuentan las imágenes perdidas
+    FULLSCREEN_MEASURE_MS = 1500
+
+    def _lost_pictures(self):
+        if self.media is None or not self.is_playing:
+            return None
+        stats = vlc.MediaStats()
+        if not self.media.get_stats(stats):
+            return None
+        return stats.lost_pictures
+
+    def _measure_lost_pictures(self, event):
+        # Imágenes perdidas en los FULLSCREEN_MEASURE_MS siguientes a un cambio
+        before = self._lost_pictures()
+        if before is None:
+            return
+        media = self.media
+
+        def report():
+            after = self._lost_pictures()
+            if after is None or self.media is not media or after < before:
+                return
+            logger.info("[FULLSCREEN] %s: %s imágenes perdidas", event, after - before)
+            self._mark_event(event, lost=after - before, overlay=self._controls_detached)
+
+        self.root.after(self.FULLSCREEN_MEASURE_MS, report)
+
+    def _mark_event(self, event, **details):
+        # Marca en las estadísticas para relacionar eventos con imágenes perdidas
+        if hasattr(self, 'stats'):
+            self.stats.mark(event, **details)
 
     def _enter_fullscreen(self):
         self.original_geometry = self.root.geometry()
         self.root.attributes("-fullscreen", True)
         self.is_fullscreen = True
         self.control_frame.pack_forget()
-        self.control_frame.place(
-            relx=0.5,
-            rely=1.0,
-            anchor="s",
-            relwidth=0.6,
-            y=-20,
-            bordermode="outside"
-        )
-
-        self.video_frame.configure(bg="black")
-        self.control_frame.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.progress_frame.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.button_frame.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.progress.configure(
-            fg_color="#202227",
-            bg_color="#202227"
-        )
-
-        self.progress.progress_slider.configure(
-            fg_color="#383838",
-            progress_color="#50555f",
-            border_width=0,
-            corner_radius=5
-        )
-
-        self.progress.time_label.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            text_color="white"
-        )
-
-        self.controls.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        for widget in self.controls.winfo_children():
-            if isinstance(widget, ctk.CTkButton):
-                try:
-                    widget.configure(
-                        fg_color="#303338",
-                        bg_color="#202227",
-                        hover_color="#404348",
-                        text_color="white",
-                        corner_radius=5
-                    )
-                except Exception as e:
-                    print(f"Error configurando botón: {e}")
-            else:
-                try:
-                    widget.configure(
-                        fg_color="#202227",
-                        bg_color="#202227"
-                    )
-                except Exception as e:
-                    print(f"Error configurando widget: {e}")
-        try:
-            self.controls.volume_slider.configure(
-                fg_color="#383838",
-                bg_color="#202227",
-                button_color="#50555f",
-                button_hover_color="#60656f",
-                progress_color="#50555f"
-            )
-        except Exception as e:
-            print(f"Error configurando volumen: {e}")
-        self.control_frame.lift()
-        self.controls_visible = True
-        self._reset_hide_controls_timer()
-        self.video_frame.bind("<Motion>", self._on_mouse_motion)
+        self._controls_detached = self._detach_controls()
+        self.controls_visible = False
+        self._show_controls()
+        # El ratón solo se sigue en pantalla completa
         self.root.bind("<Motion>", self._on_mouse_motion)
         self.video_frame.focus_set()
         self.root.after(100, lambda: self.video_frame.focus_force())
@@ -510,88 +932,16 @@ class VideoPlayer:
         self.root.attributes("-fullscreen", False)
         self.root.geometry(self.original_geometry)
         self.is_fullscreen = False
-        self.control_frame.place_forget()
+        self.root.unbind("<Motion>")
+        self._set_cursor_hidden(False)
+        if self._controls_detached:
+            self.root.wm_forget(self.control_frame)
+            self._controls_detached = False
+        else:
+            self.control_frame.place_forget()
+        self.controls_visible = True
         self.video_frame.pack(fill=tk.BOTH, expand=True)
         self.control_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=0, pady=0)
-        self.video_frame.configure(bg="black")
-
-        self.control_frame.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.progress_frame.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.button_frame.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        self.progress.configure(
-            fg_color="#202227",
-            bg_color="#202227"
-        )
-
-        self.progress.progress_slider.configure(
-            fg_color="#383838",
-            progress_color="#50555f",
-            border_width=0,
-            corner_radius=5
-        )
-
-        self.progress.time_label.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            text_color="white"
-        )
-
-        self.controls.configure(
-            fg_color="#202227",
-            bg_color="#202227",
-            corner_radius=0,
-            border_width=0
-        )
-
-        for widget in self.controls.winfo_children():
-            if isinstance(widget, ctk.CTkButton):
-                try:
-                    widget.configure(
-                        fg_color="#303338",
-                        bg_color="#202227",
-                        hover_color="#404348",
-                        text_color="white",
-                        corner_radius=5
-                    )
-                except Exception as e:
-                    print(f"Error configurando botón: {e}")
-            else:
-                try:
-                    widget.configure(
-                        fg_color="#202227",
-                        bg_color="#202227"
-                    )
-                except Exception as e:
-                    print(f"Error configurando widget: {e}")
-
-        try:
-            self.controls.volume_slider.configure(
-                fg_color="#383838",
-                bg_color="#202227",
-                button_color="#50555f",
-                button_hover_color="#60656f",
-                progress_color="#50555f"
-            )
-        except Exception as e:
-            print(f"Error configurando volumen: {e}")
 
     def _exit_fullscreen_or_close(self, event=None):
         if self.is_fullscreen:
@@ -663,41 +1013,79 @@ class VideoPlayer:
         y = (window.winfo_screenheight() // 2) - (height // 2)
         window.geometry(f'{width}x{height}+{x}+{y}')
 
-    def _seek_video(self, position):
+    # Separación mínima entre búsquedas mientras se arrastra la barra (ms)
+    SEEK_INTERVAL_MS = 80
+
+    def _seek_video(self, position, final=True):
         if not self.media_ready:
             self.total_time = self.media.get_duration()
             self.media_ready = (self.total_time > 0)
 
-        if self.media_ready and self.total_time > 0:
-            target_time = int(position * self.total_time)
+        if not (self.media_ready and self.total_time > 0):
+            return
+
+        target_time = int(position * self.total_time)
+
+        if final:
+            # Al soltar: descartar lo pendiente, una búsqueda precisa y un solo guardado
+            self._pending_seek = None
             self.player.set_time(target_time)
+            self._mark_event('seek', target=target_time)
             self.update_ui()
             self._save_position_after_action()
+            return
+
+        # Durante el arrastre solo importa el último destino; como mucho una
+        # búsqueda rápida en curso por intervalo.
+        self._pending_seek = target_time
+        if self._seek_in_flight_id is None:
+            self._issue_pending_seek()
+
+    def _issue_pending_seek(self):
+        self._seek_in_flight_id = None
+        if self._pending_seek is None:
+            return
+
+        target_time = self._pending_seek
+        self._pending_seek = None
+        self._fast_seek(target_time)
+        self._seek_in_flight_id = self.root.after(self.SEEK_INTERVAL_MS, self._issue_pending_seek)
+
+    def _fast_seek(self, target_time):
+        # libvlc 4 acepta b_fast (salto al keyframe más cercano); con libvlc 3
+        # solo existe la búsqueda precisa.
+        if self._fast_seek_supported:
+            try:
+                self.player.set_time(target_time, True)
+                return
+            except TypeError:
+                self._fast_seek_supported = False
+        self.player.set_time(target_time)
 
     def _refresh_duration(self):
         if not self.media_ready:
             self.total_time = self.media.get_duration()
             self.media_ready = (self.total_time > 0)
-        self.root.after(1000, self._refresh_duration)
+        # Una vez conocida la duración no hace falta seguir preguntando
+        return not self.media_ready
 
-    def _setup_vlc(self, video_path):
+    def _setup_vlc(self):
         vlc_args = [
             '--no-xlib',
             '--quiet',
             '--no-sub-autodetect-file'
-        ]
-        print("[SETUP_VLC] Configurando VLC con flags para desactivar subtítulos")
+        ] + self.vlc_profile.instance_args()
+        ensure_plugin_cache()
+        logger.debug("[SETUP_VLC] Configurando VLC con flags para desactivar subtítulos")
+        logger.debug("[SETUP_VLC] Perfil de rendimiento: %s", self.vlc_profile.describe())
         self.instance = vlc.Instance(vlc_args)
         self.player = self.instance.media_player_new()
-        self.media = self.instance.media_new(video_path)
-        print("[SETUP_VLC] Desactivando subtítulos explícitamente")
+        logger.debug("[SETUP_VLC] Desactivando subtítulos explícitamente")
         self.player.video_set_spu(-1)
-        self.media.parse_with_options(vlc.MediaParseFlag.local, 0)
-        events = self.media.event_manager()
-        events.event_attach(vlc.EventType.MediaParsedChanged, self.on_media_parsed)
-
-        self.player.set_media(self.media)
         self.player.video_set_scale(0)
+        # Ratón y teclado sobre el video llegan a Tk y no a la ventana de VLC
+        self.player.video_set_mouse_input(False)
+        self.player.video_set_key_input(False)
         if sys.platform == "linux":
             self.root.update_idletasks()
             x_window_id = self.video_frame.winfo_id()
@@ -707,96 +1095,241 @@ class VideoPlayer:
         elif sys.platform == "darwin":
             self.player.set_nsobject(self.video_frame.winfo_id())
 
-    def _start_player_thread(self):
-        self.player_thread = Thread(target=self._start_player)
-        self.player_thread.daemon = True
-        self.player_thread.start()
+    def _load_media(self, video_path):
+        previous = self.media
+        self.media = self.instance.media_new(video_path, *self.vlc_profile.media_options())
+        if self.decoder:
+            self.media.add_option(f":avcodec-hw={self.decoder.current}")
+        self.media.parse_with_options(vlc.MediaParseFlag.local, 0)
+        events = self.media.event_manager()
+        events.event_attach(vlc.EventType.MediaParsedChanged,
+                            lambda event: self._run_on_ui(self.on_media_parsed, event))
+        self.player.set_media(self.media)
+        if previous:
+            previous.release()
+
+    def _setup_player_events(self):
+        # Los callbacks de libvlc llegan en un hilo interno de VLC, desde el que
+        # no se debe llamar a libvlc ni a Tk: se reenvían al hilo de la interfaz.
+        self._playback_started = False
+        self._restart_paused = False
+        self._es_added_id = None
+        events = self.player.event_manager()
+        events.event_attach(vlc.EventType.MediaPlayerPlaying,
+                            lambda event: self._run_on_ui(self._on_vlc_playing))
+        events.event_attach(vlc.EventType.MediaPlayerEndReached,
+                            lambda event: self._run_on_ui(self._on_vlc_end_reached))
+        events.event_attach(vlc.EventType.MediaPlayerLengthChanged,
+                            lambda event: self._run_on_ui(self._on_vlc_length_changed, event.u.new_length))
+        events.event_attach(vlc.EventType.MediaPlayerESAdded,
+                            lambda event: self._run_on_ui(self._on_vlc_es_added))
+        events.event_attach(vlc.EventType.MediaPlayerVout,
+                            lambda event: self._run_on_ui(self._on_vlc_vout, event.u.new_count))
+
+    def _run_on_ui(self, callback, *args):
+        # Único punto de entrada desde otros hilos: nunca tocan Tk directamente
+        self.dispatcher.post(callback, *args)
 
     def _start_player(self):
-        time.sleep(0.5)
-        print(f"[START_PLAYER] Estado de subtítulos antes: {self.player.video_get_spu()}")
+        # Las consultas a libvlc de estos mensajes solo se hacen en modo DEBUG
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("[START_PLAYER] Estado de subtítulos antes: %s", self.player.video_get_spu())
         self.player.video_set_spu(-1)
-        print(f"[START_PLAYER] Estado de subtítulos después de desactivar: {self.player.video_get_spu()}")
-        print(f"Estado inicial del reproductor: {self.player.get_state()}")
+        if debug:
+            logger.debug("[START_PLAYER] Estado de subtítulos después de desactivar: %s", self.player.video_get_spu())
+            logger.debug("Estado inicial del reproductor: %s", self.player.get_state())
 
         self.root.after(1000, lambda: self.video_frame.focus_set())
         self.player.play()
         self.is_playing = True
-        print(f"Estado después de play(): {self.player.get_state()}")
-        timeout = time.time() + 5
-        while not self.media_ready and time.time() < timeout:
-            time.sleep(0.1)
+        if debug:
+            logger.debug("Estado después de play(): %s", self.player.get_state())
+
+    def _on_vlc_playing(self):
+        if self._restart_paused:
+            # Cambio de decodificador con el video en pausa: sigue en pausa
+            self._restart_paused = False
+            self.player.set_pause(1)
+            self.is_playing = False
+            self.controls.update_play_pause_button(False)
+            return
+
+        self.is_playing = True
+        self.controls.update_play_pause_button(True)
+        self._schedule_ui_update()
 
-        self._detect_embedded_subtitles()
+        if self._playback_started:
+            return
+
+        self._playback_started = True
+        if not self.media_ready:
+            self.total_time = self.media.get_duration()
+            self.media_ready = (self.total_time > 0)
+
+        if self.media_tracks is None:
+            self._refresh_tracks()
+        if self._restore_external_subtitle:
+            self._restore_saved_external_subtitle()
         self.player.video_set_scale(0)
         self.player.video_set_aspect_ratio("")
-        self.root.after(0, lambda: self.controls.update_play_pause_button(True))
+        # El gamepad y las miniaturas se inician cuando el arranque ya no compite por CPU
+        self.root.after_idle(self.init_gamepad)
+        # Archivos sin vídeo no generan MediaPlayerVout
+        self.root.after(2000, self.profiler.report)
+        self.root.after(self.THUMBNAIL_START_DELAY_MS, self._start_thumbnails)
+        self.root.after(self.CUES_START_DELAY_MS, self._start_subtitle_cues)
+        if self.decoder:
+            self.clock.register('decoder', self._watch_decoder, 1000, self.DECODER_WATCH_DELAY_MS)
+
+    THUMBNAIL_START_DELAY_MS = 5000
+    CUES_START_DELAY_MS = 2000
+    # Las pérdidas del arranque no cuentan para juzgar el decodificador
+    DECODER_WATCH_DELAY_MS = 2000
+
+    def _video_format(self):
+        try:
+            for track in self.media.tracks_get() or []:
+                if track.type == vlc.TrackType.video:
+                    return fourcc(track.codec), track.video.contents.width, track.video.contents.height
+        except Exception as e:
+            logger.warning("[DECODER] No se pudo leer el formato de video: %s", e)
+        return None
 
-        while self.is_playing:
-            time.sleep(0.1)
-            player_state = self.player.get_state()
+    def _watch_decoder(self):
+        if self.decoder.key is None or self._format_pending:
+            video_format = self._video_format()
+            self._format_pending = video_format is None
+            if video_format:
+                remembered = self.decoder.identify(*video_format)
+                if remembered:
+                    # _restart_with_decoder vuelve a registrar el vigilante
+                    self._restart_with_decoder(remembered)
+                    return None
+
+        if not self.is_playing:
+            return None
+
+        stats = vlc.MediaStats()
+        if not self.media.get_stats(stats):
+            return None
+
+        verdict = self.decoder.check(stats.displayed_pictures, stats.lost_pictures)
+        if verdict is None:
+            return None
+        if not verdict:
+            decoder = self.decoder.next_decoder()
+            if decoder:
+                self._restart_with_decoder(decoder)
+                return None
+        return False
+
+    def _restart_with_decoder(self, decoder):
+        # Reabre el media con otro decodificador en la misma posición
+        logger.info("[DECODER] Cambiando a %s", decoder)
+        self._mark_event('decoder', decoder=decoder)
+        position = self.player.get_time()
+        spu = self.player.video_get_spu()
+        was_playing = self.is_playing
+        self.decoder.switch(decoder)
+        self.player.stop()
+        self._load_media(self.video_path)
+        if position > 0:
+            self.media.add_option(f":start-time={position / 1000:.3f}")
+        if self.current_audio_track is not None:
+            self.media.add_option(f":audio-track-id={self.current_audio_track}")
+        if not was_playing:
+            self.media.add_option(":start-paused")
+            self._restart_paused = True
+        self.player.play()
+        self.root.after(1000, self._restore_subtitles, spu)
+        self.clock.register('decoder', self._watch_decoder, 1000, self.DECODER_WATCH_DELAY_MS)
 
-            if player_state == vlc.State.Ended:
-                print("Video terminado, eliminando posición guardada...")
-                self.pegasus_utils.remove_video_position(self.video_name)
-                self.root.after(0, self.close_player)
-                break
+    def _restore_subtitles(self, spu):
+        if self.subtitle_path:
+            self.player.video_set_subtitle_file(self.subtitle_path)
+        self.player.video_set_spu(spu)
+
+    def _start_thumbnails(self):
+        if self.thumbnails or self.total_time <= 0:
+            return
 
-    def _detect_embedded_subtitles(self):
         try:
-            timeout = time.time() + 5
-            while not self.player.is_playing() and time.time() < timeout:
-                time.sleep(0.1)
-            track_list = self.player.video_get_spu_description()
-            print(f"[SUBTITLE_DETECT] Pistas detectadas: {track_list}")
-
-            valid_tracks = [track for track in track_list if track[0] != -1] if track_list else []
-
-            if valid_tracks:
-                self.embedded_subtitles = []
-                for track in valid_tracks:
-                    try:
-                        name = track[1].decode('utf-8') if isinstance(track[1], bytes) else str(track[1])
-                        self.embedded_subtitles.append({
-                            'id': track[0],
-                            'name': name,
-                            'language': self._guess_subtitle_language(name)
-                        })
-                    except Exception as e:
-                        print(f"[SUBTITLE] Error procesando pista {track}: {str(e)}")
-
-                print(f"[SUBTITLE] Subtítulos cargados: {len(self.embedded_subtitles)} pistas")
-                print(f"[SUBTITLE] IDs disponibles: {[sub['id'] for sub in self.embedded_subtitles]}")
-
-                self._verify_subtitles_availability()
-            else:
-                print("[SUBTITLE] No se encontraron pistas de subtítulos válidas")
-                self.embedded_subtitles = []
+            video_size = self.player.video_get_size()
+        except Exception:
+            video_size = None
 
+        try:
+            self.thumbnails = ThumbnailExtractor(
+                self.video_path,
+                self.total_time,
+                video_size=video_size,
+                on_ready=lambda index: self._run_on_ui(self.progress.refresh_preview)
+            )
+            self.progress.set_preview_provider(self.thumbnails.get)
+            self.thumbnails.start()
         except Exception as e:
-            print(f"[SUBTITLE] Error en detección: {str(e)}")
-            traceback.print_exc()
-            self.embedded_subtitles = []
-        self.root.after(0, self._update_subtitle_ui_state)
-
+            logger.warning("[THUMBS] No se pudo iniciar la vista previa: %s", e)
+            self.thumbnails = None
+
+    def _on_vlc_vout(self, count):
+        if count > 0:
+            self.profiler.mark("primer fotograma")
+            self.profiler.report()
+
+    def _on_vlc_length_changed(self, length):
+        if length > 0:
+            self.total_time = length
+            self.media_ready = True
+
+    def _on_vlc_es_added(self):
+        # Las pistas pueden aparecer después del primer fotograma; se agrupan
+        # las ráfagas de eventos en una sola detección.
+        if not self._playback_started:
+            return
+        if self._es_added_id:
+            self.root.after_cancel(self._es_added_id)
+        self._es_added_id = self.root.after(250, self._on_es_added_settled)
 
-    def _verify_subtitles_availability(self):
+    def _on_es_added_settled(self):
+        self._es_added_id = None
+        self._refresh_tracks()
 
-        if not hasattr(self, 'embedded_subtitles'):
-            return False
+    def _on_vlc_end_reached(self):
+        logger.info("Video terminado, eliminando posición guardada...")
+        self.is_playing = False
+        pegasus_utils = self._get_pegasus_utils()
+        if pegasus_utils:
+            pegasus_utils.remove_video_position(self.video_name)
+        self.close_player()
 
-        for sub in self.embedded_subtitles[:]:
-            try:
-                self.player.video_set_spu(sub['id'])
-                actual_spu = self.player.video_get_spu()
-                if actual_spu != sub['id']:
-                    print(f"[SUBTITLE] Pista {sub['id']} no accesible, removiendo")
-                    self.embedded_subtitles.remove(sub)
-            except Exception as e:
-                print(f"[SUBTITLE] Error verificando pista {sub['id']}: {str(e)}")
-                self.embedded_subtitles.remove(sub)
-        self.player.video_set_spu(-1)
-        return bool(self.embedded_subtitles)
+    def _refresh_tracks(self):
+        # tracks_get() solo lee lo que el analizador de libvlc ya obtuvo en su hilo
+        try:
+            tracks = read_tracks(self.media)
+        except Exception as e:
+            logger.exception("[TRACKS] Error leyendo las pistas: %s", e)
+            return
+        if tracks != self.media_tracks:
+            self.track_cache.put(self.video_path, tracks)
+            self._publish_tracks(tracks)
+
+    def _publish_tracks(self, tracks):
+        # Único punto por el que las pistas llegan a los controles, al menú
+        # de subtítulos y al gamepad
+        self.media_tracks = tracks
+        self.embedded_subtitles = tracks['subtitles']
+        if hasattr(self, '_subtitle_menu'):
+            self._subtitle_menu.embedded_subtitles = self.embedded_subtitles
+        if hasattr(self, '_audio_menu'):
+            self._audio_menu.embedded_subtitles = tracks['audio']
+        if hasattr(self, 'controls'):
+            self.controls.set_audio_tracks_state(len(tracks['audio']) > 1)
+        if logger.isEnabledFor(logging.DEBUG):
+            for kind, items in tracks.items():
+                for track in items:
+                    logger.debug("[TRACKS] %s: %s", kind, track)
+        self._update_subtitle_ui_state()
 
     def _update_subtitle_ui_state(self):
         has_embedded_subtitles = bool(getattr(self, 'embedded_subtitles', []))
@@ -804,12 +1337,13 @@ class VideoPlayer:
         has_any_subtitles = has_external_subtitle or has_embedded_subtitles
 
         current_spu = self.player.video_get_spu()
-        subtitle_enabled = current_spu != -1 or (current_spu == 0 and has_external_subtitle and self.subtitle_enabled)
+        # Una pista guardada puede estar elegida antes de que VLC cree su ES
+        subtitle_enabled = current_spu != -1 or self.subtitle_enabled
 
-        print(f"[UI_UPDATE] Subtítulos externos: {has_external_subtitle}")
-        print(f"[UI_UPDATE] Subtítulos incrustados: {has_embedded_subtitles}")
-        print(f"[UI_UPDATE] SPU actual: {current_spu}")
-        print(f"[UI_UPDATE] Estado final: disponible={has_any_subtitles}, activo={subtitle_enabled}")
+        logger.debug("[UI_UPDATE] Subtítulos externos: %s", has_external_subtitle)
+        logger.debug("[UI_UPDATE] Subtítulos incrustados: %s", has_embedded_subtitles)
+        logger.debug("[UI_UPDATE] SPU actual: %s", current_spu)
+        logger.debug("[UI_UPDATE] Estado final: disponible=%s, activo=%s", has_any_subtitles, subtitle_enabled)
 
         if hasattr(self, 'controls'):
             self.controls.set_embedded_subtitles_state(available=has_embedded_subtitles)
@@ -818,60 +1352,6 @@ class VideoPlayer:
                 enabled=subtitle_enabled
             )
 
-    def _guess_subtitle_language(self, track_name):
-        if not track_name:
-            return "Desconocido"
-
-        if hasattr(self, 'embedded_subtitles'):
-            for sub in self.embedded_subtitles:
-                if sub.get('name') == track_name and sub.get('language'):
-                    return sub['language']
-
-        return "Español"
-
-    def _detect_embedded_subtitles(self):
-        try:
-            timeout = time.time() + 5
-            while not self.player.is_playing() and time.time() < timeout:
-                time.sleep(0.1)
-
-            track_list = self.player.video_get_spu_description()
-            print(f"[SUBTITLE_DETECT] Pistas detectadas: {track_list}")
-
-            valid_tracks = [track for track in track_list if track[0] != -1] if track_list else []
-
-            if valid_tracks:
-                self.embedded_subtitles = []
-                for track in valid_tracks:
-                    try:
-                        name = track[1].decode('utf-8') if isinstance(track[1], bytes) else str(track[1])
-                        lang = self._guess_subtitle_language(name)
-
-                        self.embedded_subtitles.append({
-                            'id': track[0],
-                            'name': name,
-                            'language': lang
-                        })
-
-                        print(f"[SUBTITLE] Pista {track[0]} - Nombre: '{name}' - Idioma detectado: '{lang}'")
-                    except Exception as e:
-                        print(f"[SUBTITLE] Error procesando pista {track}: {str(e)}")
-
-                print(f"[SUBTITLE] Subtítulos cargados: {len(self.embedded_subtitles)} pistas")
-                print(f"[SUBTITLE] IDs disponibles: {[sub['id'] for sub in self.embedded_subtitles]}")
-
-                self._verify_subtitles_availability()
-            else:
-                print("[SUBTITLE] No se encontraron pistas de subtítulos válidas")
-                self.embedded_subtitles = []
-
-        except Exception as e:
-            print(f"[SUBTITLE] Error en detección: {str(e)}")
-            traceback.print_exc()
-            self.embedded_subtitles = []
-
-        self.root.after(0, self._update_subtitle_ui_state)
-
     def _show_subtitle_menu(self):
         if not hasattr(self, '_subtitle_menu'):
             self._subtitle_menu = SubtitleMenu(
@@ -884,68 +1364,114 @@ class VideoPlayer:
 
         self._subtitle_menu.show(self.controls.embedded_sub_button)
 
+    def _show_audio_menu(self):
+        if not hasattr(self, '_audio_menu'):
+            self._audio_menu = SubtitleMenu(
+                root=self.root,
+                parent_frame=self.control_frame,
+                embedded_subtitles=self.media_tracks['audio'] if self.media_tracks else [],
+                select_callback=self._select_audio_track,
+                locale=self.locale,
+                title_key="select_audio",
+                disable_key=None
+            )
+
+        self._audio_menu.show(self.controls.audio_button)
+
+    def _select_audio_track(self, track_id):
+        if self.player.audio_set_track(track_id) != 0:
+            logger.warning("[AUDIO] No se pudo seleccionar la pista %s", track_id)
+            return False
+        self.current_audio_track = track_id
+        self._mark_event('audio', track=track_id)
+        self._remember_track_choices()
+        logger.debug("Pista de audio seleccionada: ID=%s", track_id)
+        return True
+
     def _select_embedded_subtitle(self, sub_id):
         self.current_embedded_sub = sub_id
         self.player.video_set_spu(sub_id)
         self.subtitle_enabled = (sub_id != -1)
         self.controls.set_subtitle_state(True, self.subtitle_enabled)
+        self._mark_event('subtitle', spu=sub_id)
+        self._remember_track_choices()
 
         if hasattr(self, 'subtitle_menu') and self.subtitle_menu.winfo_exists():
             self.subtitle_menu.destroy()
 
-        print(f"Subtítulo embebido seleccionado: ID={sub_id}")
+        logger.debug("Subtítulo embebido seleccionado: ID=%s", sub_id)
 
     def on_media_parsed(self, event):
+        if self.media is None:
+            return
         self.media_ready = True
         self.total_time = self.media.get_duration()
         current_spu = self.player.video_get_spu()
-        print(f"[MEDIA_PARSED] Media preparado. Estado actual de subtítulos: {current_spu}")
+        logger.debug("[MEDIA_PARSED] Media preparado. Estado actual de subtítulos: %s", current_spu)
 
         if current_spu != -1 and not self.subtitle_enabled:
-            print("[MEDIA_PARSED] Detectada activación automática de subtítulos. Desactivando...")
+            logger.debug("[MEDIA_PARSED] Detectada activación automática de subtítulos. Desactivando...")
             self.player.video_set_spu(-1)
-            print(f"[MEDIA_PARSED] Nuevo estado de subtítulos: {self.player.video_get_spu()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[MEDIA_PARSED] Nuevo estado de subtítulos: %s", self.player.video_get_spu())
+
+        if self.media.get_parsed_status() == vlc.MediaParsedStatus.done:
+            self._refresh_tracks()
+
+    # Intervalos de refresco de la barra de progreso (ms)
+    UI_REFRESH_FAST = 100
+    UI_REFRESH_SLOW = 1000
 
     def update_ui(self):
-        if self.is_playing:
-            position = self.player.get_time()
+        position = self.player.get_time()
+
+        if self.total_time <= 0 and self.media_ready:
+            self.total_time = self.media.get_duration()
+
+        if position >= 0 and self.total_time > 0:
+            self.progress.update_progress(position, self.total_time)
 
-            if self.total_time <= 0 and self.media_ready:
-                self.total_time = self.media.get_duration()
+        self.clock.set_period('ui', self._ui_refresh_interval())
 
-            if position >= 0 and self.total_time > 0:
-                self.progress.update_progress(position, self.total_time)
+    def _ui_refresh_interval(self):
+        # En pausa o minimizado no hay nada que refrescar; los eventos
+        # Playing y <Map> vuelven a activar el refresco.
+        if not self.is_playing or self.root.state() == "iconic":
+            return None
+        if self.controls_visible or self.progress.user_interacting:
+            return self.UI_REFRESH_FAST
+        return self.UI_REFRESH_SLOW
 
-        self.root.after(100, self.update_ui)
+    def _schedule_ui_update(self):
+        self.clock.trigger('ui')
 
     def _seek_to_saved_position(self, attempts=5):
         if attempts <= 0:
-            print("No se pudo cargar la posición guardada - demasiados intentos")
+            logger.warning("No se pudo cargar la posición guardada - demasiados intentos")
             return
 
-        print(f"Intentando cargar posición guardada (intentos restantes: {attempts})")
-        print(f"Media ready: {self.media_ready}, Player exists: {hasattr(self, 'player')}")
+        logger.debug("Intentando cargar posición guardada (intentos restantes: %s)", attempts)
+        logger.debug("Media ready: %s, Player exists: %s", self.media_ready, hasattr(self, 'player'))
 
         if self.saved_position > 0:
             if self.media_ready and hasattr(self, 'player') and self.player:
-                print(f"Saltando a posición guardada: {self.saved_position}ms")
+                logger.debug("Saltando a posición guardada: %sms", self.saved_position)
                 self.player.set_time(self.saved_position)
                 self.update_ui()
             else:
-                print("Media no listo, reintentando...")
+                logger.debug("Media no listo, reintentando...")
                 self.root.after(500, lambda: self._seek_to_saved_position(attempts-1))
 
     def _save_position(self):
         if self.is_playing or self.player.get_state() == vlc.State.Paused:
             current_pos = self.player.get_time()
-            if current_pos > 0:
-                self.pegasus_utils.save_video_position(self.video_name, current_pos)
-                print(f"Posición guardada: {current_pos}ms")
+            pegasus_utils = self._get_pegasus_utils()
+            if current_pos > 0 and pegasus_utils:
+                pegasus_utils.save_video_position(self.video_name, current_pos)
+                logger.debug("Posición guardada: %sms", current_pos)
 
     def _setup_save_events(self):
         self.root.bind("<space>", lambda e: self._save_position_after_action())
-        self.progress.progress_slider.bind("<ButtonRelease-1>",
-                                         lambda e: self._save_position())
 
         self.root.bind("<Left>", lambda e: self._save_position_after_action())
         self.root.bind("<Right>", lambda e: self._save_position_after_action())
@@ -954,36 +1480,41 @@ class VideoPlayer:
         self.root.after(delay, self._save_position)
 
     def toggle_play_pause(self, event=None):
-        print("[DEBUG] Ejecutando toggle_play_pause")
+        logger.debug("[DEBUG] Ejecutando toggle_play_pause")
         if hasattr(self, 'player') and self.player:
-            print(f"Estado actual: {'Reproduciendo' if self.player.is_playing() else 'Pausado'}")
             if self.player.is_playing():
-                print("Pausando reproducción...")
+                logger.debug("Pausando reproducción...")
                 self.player.pause()
                 self.is_playing = False
                 self._save_position()
             else:
-                print("Iniciando reproducción...")
+                logger.debug("Iniciando reproducción...")
+                # El usuario reanuda: la pausa pendiente de un cambio de decodificador ya no vale
+                self._restart_paused = False
                 self.player.play()
                 self.is_playing = True
                 self._save_position_after_action()
 
-            print(f"Nuevo estado: {'Reproduciendo' if self.player.is_playing() else 'Pausado'}")
             self.controls.update_play_pause_button(self.is_playing)
 
     def close_player(self):
-        if hasattr(self, 'player') and self.player:
-            player_state = self.player.get_state()
-            if player_state != vlc.State.Ended:
-                current_pos = self.player.get_time()
-                if current_pos > 0:
-                    self.pegasus_utils.save_video_position(self.video_name, current_pos)
-                    print(f"Posición final guardada: {current_pos}ms")
-            else:
-                print("Video terminado, no se guarda posición")
+        result = self._stop_session()
+        if self.resident:
+            self._finish_session(result)
+            return
 
-            self.player.stop()
-            self.is_playing = False
+        if getattr(self, 'pegasus_utils', None):
+            self.pegasus_utils.close_async()
+
+        if hasattr(self, 'stats'):
+            self.stats.close()
+
+        if hasattr(self, 'clock'):
+            self.clock.report_stats()
+            self.clock.stop()
+
+        if hasattr(self, 'dispatcher'):
+            self.dispatcher.close()
 
         if hasattr(self, 'root'):
             self.root.quit()
@@ -993,35 +1524,184 @@ class VideoPlayer:
             try:
                 self.gamepad.stop()
             except Exception as e:
-                print(f"Error deteniendo gamepad: {str(e)}")
+                logger.error("Error deteniendo gamepad: %s", e)
+
+    def _stop_session(self):
+        # Guarda la posición y detiene la reproducción del video actual
+        result = {'path': self.video_path, 'position': 0, 'ended': False}
+        if hasattr(self, 'player') and self.player and self.video_path:
+            player_state = self.player.get_state()
+            pegasus_utils = self._get_pegasus_utils()
+            if player_state != vlc.State.Ended:
+                current_pos = self.player.get_time()
+                result['position'] = max(current_pos, 0)
+                if current_pos > 0 and pegasus_utils:
+                    pegasus_utils.save_video_position(self.video_name, current_pos)
+                    logger.info("Posición final guardada: %sms", current_pos)
+            else:
+                result['ended'] = True
+                logger.info("Video terminado, no se guarda posición")
+
+            self.player.stop()
+            self.is_playing = False
+
+        if getattr(self, 'thumbnails', None):
+            self.thumbnails.stop()
+            self.thumbnails = None
+        return result
+
+    def _finish_session(self, result):
+        # Modo residente: se oculta la ventana y se deja todo listo para el
+        # siguiente open(); VLC, Tk y el gamepad siguen vivos.
+        if self.is_fullscreen:
+            self._toggle_fullscreen()
+
+        pegasus_utils = self._get_pegasus_utils()
+
+        # Sin media el reproductor no puede reanudar el video anterior
+        # aunque llegue una orden del gamepad con la ventana oculta
+        self.player.set_media(None)
+        if self.media:
+            self.media.release()
+            self.media = None
+        self.media_ready = False
+        self.total_time = 0
+        self.clock.unregister('duration')
+        self.clock.unregister('decoder')
+        # Un informe por sesión: el reloj sigue vivo para el siguiente video
+        self.clock.report_stats()
+        self.clock.reset_stats()
+        self.stats.stop()
+        self.progress.reset()
+        if hasattr(self, '_subtitle_menu'):
+            self._subtitle_menu.close()
+            del self._subtitle_menu
+        if hasattr(self, '_audio_menu'):
+            self._audio_menu.close()
+            del self._audio_menu
+
+        self.video_path = None
+        self.video_name = None
+        self.subtitle_path = None
+        self.subtitle_cues = None
+        self.subtitle_enabled = False
+        self.embedded_subtitles = []
+        self.media_tracks = None
+        self.current_embedded_sub = -1
+        self.current_audio_track = None
+        self.root.withdraw()
+
+        callback, self.on_session_end = self.on_session_end, None
+        if pegasus_utils:
+            # Guardar puede esperar por el bloqueo de la base de datos: se hace
+            # fuera del hilo de Tk y el cliente recibe el final con todo en disco
+            pegasus_utils.close_async(lambda saved: callback and self._run_on_ui(callback, result))
+        elif callback:
+            callback(result)
 
     def run(self):
         self.root.mainloop()
 
     def _rewind_10s(self, event=None):
-        print("[DEBUG] Ejecutando _rewind_10s")
+        logger.debug("[DEBUG] Ejecutando _rewind_10s")
         if self.media_ready and hasattr(self, 'player') and self.player:
             current_time = self.player.get_time()
-            print(f"Tiempo actual: {current_time}")
+            logger.debug("Tiempo actual: %s", current_time)
             new_time = max(0, current_time - 10000)
-            print(f"Nuevo tiempo: {new_time}")
+            logger.debug("Nuevo tiempo: %s", new_time)
             self.player.set_time(new_time)
-            print(f"Tiempo después de set_time: {self.player.get_time()}")
+            self._mark_event('seek', target=new_time)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tiempo después de set_time: %s", self.player.get_time())
             self.update_ui()
             self._save_position_after_action()
 
     def _forward_10s(self, event=None):
-        print("[DEBUG] Ejecutando _forward_10s")
+        logger.debug("[DEBUG] Ejecutando _forward_10s")
         if self.media_ready and hasattr(self, 'player') and self.player and self.total_time > 0:
             current_time = self.player.get_time()
-            print(f"Tiempo actual: {current_time}")
+            logger.debug("Tiempo actual: %s", current_time)
             new_time = min(self.total_time, current_time + 10000)
-            print(f"Nuevo tiempo: {new_time}")
+            logger.debug("Nuevo tiempo: %s", new_time)
             self.player.set_time(new_time)
-            print(f"Tiempo después de set_time: {self.player.get_time()}")
+            self._mark_event('seek', target=new_time)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tiempo después de set_time: %s", self.player.get_time())
             self.update_ui()
             self._save_position_after_action()
 
+    def _seek_to_time(self, target_time):
+        target_time = max(0, target_time)
+        if self.total_time > 0:
+            target_time = min(self.total_time, target_time)
+        self.player.set_time(target_time)
+        self._mark_event('seek', target=target_time)
+        self.update_ui()
+        self._save_position_after_action()
+
+    # Se salta a un poco antes de la línea para no cortar su primera palabra
+    CUE_LEAD_MS = 200
+    # Silencio mínimo (sin diálogo) que se salta con skip_silence
+    SILENCE_MIN_GAP_MS = 5000
+    SILENCE_CHECK_MS = 500
+
+    def _start_subtitle_cues(self):
+        if self.subtitle_cues:
+            self.subtitle_cues.start()
+
+    def _get_subtitle_cues(self):
+        # Si el índice aún no se pidió se empieza ahora; mientras se construye
+        # no hay navegación por diálogos
+        if not (self.subtitle_cues and self.media_ready):
+            return None
+        self.subtitle_cues.start()
+        return self.subtitle_cues if self.subtitle_cues.ready else None
+
+    def _jump_to_line(self, forward):
+        cues = self._get_subtitle_cues()
+        if not cues:
+            return None
+        current = self.player.get_time()
+        cue = cues.next_cue(current) if forward else cues.previous_cue(current)
+        if cue:
+            logger.debug("[CUES] Saltando a la línea de %s ms", cue[0])
+            self._seek_to_time(cue[0] - self.CUE_LEAD_MS)
+        return cue
+
+    def _search_subtitles(self, query):
+        cues = self._get_subtitle_cues()
+        if not (cues and query):
+            return None
+        self._last_search = query
+        cue = cues.search(query, self.player.get_time())
+        if cue:
+            logger.debug("[CUES] '%s' encontrado en %s ms", query, cue[0])
+            self._seek_to_time(cue[0] - self.CUE_LEAD_MS)
+        else:
+            logger.info("[CUES] '%s' no aparece en los subtítulos", query)
+        return cue
+
+    def _toggle_skip_silence(self):
+        self.skip_silence = not self.skip_silence
+        if self.skip_silence:
+            self.clock.register('silence', self._check_silence, self.SILENCE_CHECK_MS)
+        else:
+            self.clock.unregister('silence')
+        logger.info("[CUES] Saltar silencios: %s", self.skip_silence)
+        self._mark_event('skip_silence', enabled=self.skip_silence)
+        return self.skip_silence
+
+    def _check_silence(self):
+        if not self.is_playing:
+            return
+        cues = self._get_subtitle_cues()
+        if not cues:
+            return
+        target = cues.silence_end(self.player.get_time(), self.SILENCE_MIN_GAP_MS)
+        if target is not None:
+            logger.debug("[CUES] Saltando silencio hasta %s ms", target)
+            self._seek_to_time(target - self.CUE_LEAD_MS)
+
     def _toggle_mute(self):
         current_volume = self.player.audio_get_volume()
         if current_volume > 0:
@@ -1047,79 +1727,173 @@ class VideoPlayer:
         if volume > 0:
             self.last_volume = volume
 
-    def _on_mouse_motion(self, event):
-        if self.is_fullscreen:
-            if not self.controls_visible:
-                self._show_controls()
+    # Tiempo sin mover el ratón tras el que se ocultan los controles
+    CONTROLS_HIDE_MS = 1000
+
+    def _on_mouse_motion(self, event=None):
+        # Solo se anota la hora: el temporizador pendiente decide al vencer
+        # si hay que ocultar o esperar más, sin cancelarlo en cada evento.
+        self._last_motion = time.monotonic()
+        if not self.controls_visible:
+            self._show_controls()
+        elif self.hide_controls_timer_id is None:
+            self._reset_hide_controls_timer()
+
+    # Ancho de los controles en pantalla completa y separación del borde inferior
+    OVERLAY_RELWIDTH = 0.6
+    OVERLAY_MARGIN = 20
+
+    def _detach_controls(self):
+        # En pantalla completa los controles pasan a una ventana propia sin
+        # decoración encima del video: mostrarlos u ocultarlos no toca la
+        # geometría de video_frame y VLC no tiene que renegociar su salida.
+        try:
+            self.root.wm_manage(self.control_frame)
+            self.root.tk.call('wm', 'overrideredirect', self.control_frame, 1)
+            self.root.tk.call('wm', 'withdraw', self.control_frame)
+        except tk.TclError as e:
+            logger.warning("[FULLSCREEN] Controles superpuestos no disponibles, se usa place: %s", e)
+            try:
+                self.root.wm_forget(self.control_frame)
+            except tk.TclError:
+                pass
+            return False
+        self.control_frame.bind("<Enter>", self._on_overlay_enter)
+        self.control_frame.bind("<Leave>", self._on_overlay_leave)
+        return True
+
+    def _position_overlay(self):
+        root_width = self.root.winfo_width()
+        width = int(root_width * self.OVERLAY_RELWIDTH)
+        height = self.control_frame.winfo_reqheight()
+        x = self.root.winfo_rootx() + (root_width - width) // 2
+        y = self.root.winfo_rooty() + self.root.winfo_height() - height - self.OVERLAY_MARGIN
+        self.root.tk.call('wm', 'geometry', self.control_frame, f"{width}x{height}+{x}+{y}")
+
+    def _on_root_configure(self, event):
+        # El gestor de ventanas aplica la pantalla completa después de pedirla
+        if event.widget is self.root and self._controls_detached and self.controls_visible:
+            self._position_overlay()
+
+    def _on_overlay_enter(self, event=None):
+        # Con el puntero sobre los controles no se ocultan
+        if self.hide_controls_timer_id:
+            self.root.after_cancel(self.hide_controls_timer_id)
+            self.hide_controls_timer_id = None
+
+    def _on_overlay_leave(self, event=None):
+        if self.is_fullscreen and self.controls_visible:
             self._reset_hide_controls_timer()
-            self.last_mouse_position = (event.x, event.y)
-            self.mouse_idle_time = 0
 
     def _show_controls(self):
         if self.is_fullscreen and not self.controls_visible:
-            self.control_frame.place(
-                relx=0.5,
-                rely=1.0,
-                anchor="s",
-                relwidth=0.6,
-                y=-20,
-                bordermode="outside"
-            )
+            if self._controls_detached:
+                self._position_overlay()
+                self.root.tk.call('wm', 'deiconify', self.control_frame)
+            else:
+                self.control_frame.place(
+                    relx=0.5,
+                    rely=1.0,
+                    anchor="s",
+                    relwidth=self.OVERLAY_RELWIDTH,
+                    y=-self.OVERLAY_MARGIN,
+                    bordermode="outside"
+                )
             self.control_frame.lift()
             self.controls_visible = True
+            self._measure_lost_pictures('controls_lost')
+            self._set_cursor_hidden(False)
             self._reset_hide_controls_timer()
+            self._schedule_ui_update()
 
     def _hide_controls(self):
         if self.is_fullscreen and self.controls_visible:
-            self.control_frame.place_forget()
+            if self._controls_detached:
+                self.root.tk.call('wm', 'withdraw', self.control_frame)
+            else:
+                self.control_frame.place_forget()
+            self.progress.hide_preview()
             self.controls_visible = False
+            self._measure_lost_pictures('controls_lost')
+            self._set_cursor_hidden(self.hide_cursor)
         self.hide_controls_timer_id = None
 
+    def _set_cursor_hidden(self, hidden):
+        if hidden == self._cursor_hidden:
+            return
+        cursor = "none" if hidden else ""
+        self.root.configure(cursor=cursor)
+        self.video_frame.configure(cursor=cursor)
+        self._cursor_hidden = hidden
+
+    def _on_hide_controls_timer(self):
+        self.hide_controls_timer_id = None
+        idle_ms = (time.monotonic() - self._last_motion) * 1000
+        if idle_ms < self.CONTROLS_HIDE_MS:
+            self.hide_controls_timer_id = self.root.after(
+                int(self.CONTROLS_HIDE_MS - idle_ms) + 1, self._on_hide_controls_timer)
+            return
+        self._hide_controls()
+
     def _reset_hide_controls_timer(self):
-        if hasattr(self, 'hide_controls_timer_id') and self.hide_controls_timer_id:
+        if self.hide_controls_timer_id:
             self.root.after_cancel(self.hide_controls_timer_id)
-        self.hide_controls_timer_id = self.root.after(1000, self._hide_controls)
+        self._last_motion = time.monotonic()
+        self.hide_controls_timer_id = self.root.after(self.CONTROLS_HIDE_MS, self._on_hide_controls_timer)
 
     def _init_fullscreen_controls(self):
         self.controls_visible = True
-        self.last_mouse_position = (0, 0)
-        self.mouse_idle_time = 0
-        self.root.after(100, self._check_mouse_activity)
-
-    def _check_mouse_activity(self):
-        if self.is_fullscreen:
-            mouse_x = self.root.winfo_pointerx() - self.root.winfo_rootx()
-            mouse_y = self.root.winfo_pointery() - self.root.winfo_rooty()
-            current_pos = (mouse_x, mouse_y)
-
-            if current_pos != self.last_mouse_position:
-                self.last_mouse_position = current_pos
-                self.mouse_idle_time = 0
-
-                if not self.controls_visible:
-                    self._show_controls()
-            else:
-                self.mouse_idle_time += 100
-
-                if self.mouse_idle_time > 3000 and self.controls_visible:
-                    self._hide_controls()
-        self.root.after(100, self._check_mouse_activity)
+        self._controls_detached = False
+        self.hide_controls_timer_id = None
+        self.root.bind("<Configure>", self._on_root_configure, add="+")
+        self._last_motion = 0
+        self._cursor_hidden = False
 
     def _handle_rewind(self, event=None):
-        print("[DEBUG] Tecla izquierda presionada - Retroceder 10s")
+        logger.debug("[DEBUG] Tecla izquierda presionada - Retroceder 10s")
         self._rewind_10s()
         return "break"
 
     def _handle_forward(self, event=None):
-        print("[DEBUG] Tecla derecha presionada - Avanzar 10s")
+        logger.debug("[DEBUG] Tecla derecha presionada - Avanzar 10s")
         self._forward_10s()
         return "break"
 
     def _handle_play_pause(self, event=None):
-        print("[DEBUG] Barra espaciadora presionada - Play/Pause")
+        logger.debug("[DEBUG] Barra espaciadora presionada - Play/Pause")
         self.toggle_play_pause()
         return "break"
 
+    def _handle_previous_line(self, event=None):
+        self._jump_to_line(forward=False)
+        return "break"
+
+    def _handle_next_line(self, event=None):
+        self._jump_to_line(forward=True)
+        return "break"
+
+    def _handle_skip_silence(self, event=None):
+        self._toggle_skip_silence()
+        return "break"
+
+    def _handle_search_subtitles(self, event=None):
+        if not self._get_subtitle_cues():
+            return "break"
+        dialog = ctk.CTkInputDialog(
+            title=self.locale["search_subtitles_title"],
+            text=self.locale["search_subtitles_prompt"]
+        )
+        query = dialog.get_input()
+        if query:
+            self._search_subtitles(query)
+        self.video_frame.focus_set()
+        return "break"
+
+    def _handle_search_next(self, event=None):
+        if self._last_search:
+            self._search_subtitles(self._last_search)
+        return "break"
+
     def _handle_volume_up(self, event=None):
         self._increase_volume()
         return "break"
@@ -30,49 +30,144 @@ class ProgressBar(ctk.CTkFrame):
         self.time_label.grid(row=0, column=2, sticky="w", padx=(10, 0))
         self.seek_callback = None
         self.user_interacting = False
+        self._last_slider_value = None
+        self._last_time_text = None
+        self._duration = 0
+        self.preview_provider = None
+        self.preview_window = None
+        self.preview_label = None
+        self._preview_position = None
+        self._preview_image = None
         self.progress_slider.bind("<Button-1>", self._on_click_progress)
         self.progress_slider.bind("<B1-Motion>", self._on_drag_progress)
         self.progress_slider.bind("<ButtonRelease-1>", self._on_release_progress)
+        self.progress_slider.bind("<Motion>", self._on_hover_progress)
+        self.progress_slider.bind("<Leave>", lambda e: self.hide_preview())
 
     def set_seek_callback(self, callback):
         self.seek_callback = callback
 
+    def set_preview_provider(self, provider):
+        # provider(posición 0..1) -> PIL.Image o None si aún no está extraída
+        self.preview_provider = provider
+
     def _on_click_progress(self, event):
         self.user_interacting = True
-        self._update_video_position()
-        if self.seek_callback:
-            position = self.progress_slider.get() / 100
-            self.seek_callback(position)
+        self._last_slider_value = None
+        self._update_video_position(final=False)
 
     def _on_drag_progress(self, event):
-        self._update_video_position()
+        self._update_video_position(final=False)
+        self._show_preview(self.progress_slider.get() / 100, event.x)
 
     def _on_release_progress(self, event):
         self.user_interacting = False
-        if self.seek_callback:
-            position = self.progress_slider.get() / 100
-            self.seek_callback(position)
+        self._update_video_position(final=True)
+        self.hide_preview()
+
+    def _on_hover_progress(self, event):
+        width = self.progress_slider.winfo_width()
+        if width > 0:
+            self._show_preview(min(max(event.x / width, 0.0), 1.0), event.x)
+
+    def _show_preview(self, position, x):
+        if not self.preview_provider or self._duration <= 0:
+            return
+
+        if self.preview_label is None:
+            self._create_preview()
+
+        image = self.preview_provider(position)
+        if image is not self._preview_image:
+            self._preview_image = image
+            self.preview_label.configure(image=ctk.CTkImage(image, size=image.size) if image else None)
+        self._preview_position = position
+        self.preview_label.configure(text=self._ms_to_hms(position * self._duration))
+
+        # Coordenadas de pantalla: en pantalla completa la barra está en la
+        # ventana superpuesta de los controles, no en la principal
+        self.preview_window.update_idletasks()
+        width = self.preview_window.winfo_reqwidth()
+        height = self.preview_window.winfo_reqheight()
+        window_x = self.progress_slider.winfo_rootx() + x - width // 2
+        window_y = self.progress_slider.winfo_rooty() - height - 6
+        self.preview_window.geometry(f"+{window_x}+{window_y}")
+        if self.preview_window.state() == "withdrawn":
+            self.preview_window.deiconify()
+        self.preview_window.lift()
 
-    def _update_video_position(self):
+    def _create_preview(self):
+        # Ventana propia sin decoración: no la recorta la ventana de los controles
+        self.preview_window = tk.Toplevel(self._root(), bg="#202227")
+        self.preview_window.withdraw()
+        self.preview_window.overrideredirect(True)
+        self.preview_window.attributes("-topmost", True)
+        self.preview_label = ctk.CTkLabel(
+            self.preview_window,
+            text="",
+            compound="top",
+            fg_color="#202227",
+            text_color="white",
+            corner_radius=4
+        )
+        self.preview_label.pack()
+
+    def refresh_preview(self):
+        # Llamado cuando el extractor termina una miniatura que se estaba esperando
+        if not self.preview_provider or self._preview_position is None:
+            return
+        if self.preview_label and self.preview_window.state() != "withdrawn":
+            image = self.preview_provider(self._preview_position)
+            if image is not None and image is not self._preview_image:
+                self._preview_image = image
+                self.preview_label.configure(image=ctk.CTkImage(image, size=image.size))
+
+    def hide_preview(self):
+        if self.preview_label and not self.user_interacting:
+            self.preview_window.withdraw()
+            self._preview_position = None
+
+    def reset(self):
+        # Deja la barra lista para otro video
+        self.preview_provider = None
+        self.user_interacting = False
+        self.hide_preview()
+        self.update_progress(0, 0)
+
+    def _update_video_position(self, final):
         if self.seek_callback:
             position = self.progress_slider.get() / 100
-            self.seek_callback(position)
+            self.seek_callback(position, final)
 
     def update_progress(self, position, duration):
+        self._duration = duration
         if not self.user_interacting:
             if duration <= 0:
-                self.time_label.configure(text="Cargando...")
-                self.progress_slider.set(0)
+                self._set_slider(0)
+                self._set_time_text("Cargando...")
             else:
                 relative_pos = min((position / duration) * 100, 100)
-                self.progress_slider.set(relative_pos)
-                self.time_label.configure(text=self._format_time(position, duration))
+                self._set_slider(relative_pos)
+                self._set_time_text(self._format_time(position, duration))
 
-    def _format_time(self, position, duration):
-        def ms_to_hms(ms):
-            seconds = int(ms / 1000)
-            hours, remainder = divmod(seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}" if hours > 0 else f"{minutes:02d}:{seconds:02d}"
+    # Cada configure/set redibuja el canvas del widget: solo se llama si cambia
+    def _set_slider(self, value):
+        value = round(value, 2)
+        if value != self._last_slider_value:
+            self._last_slider_value = value
+            self.progress_slider.set(value)
+
+    def _set_time_text(self, text):
+        if text != self._last_time_text:
+            self._last_time_text = text
+            self.time_label.configure(text=text)
 
-        return f"{ms_to_hms(position)} / {ms_to_hms(duration)}"
+    @staticmethod
+    def _ms_to_hms(ms):
+        seconds = int(ms / 1000)
+        hours, remainder = divmod(seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}" if hours > 0 else f"{minutes:02d}:{seconds:02d}"
+
+    def _format_time(self, position, duration):
+        return f"{self._ms_to_hms(position)} / {self._ms_to_hms(duration)}"
@@ -0,0 +1,36 @@
+import threading
+import time
+
+class StartupProfiler:
+    # Tiempos de cada etapa del arranque; solo se imprimen con --profile-startup
+
+    def __init__(self, enabled=False, start=None):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.stages = []
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def mark(self, stage):
+        # Etapa secuencial: dura desde la marca anterior hasta ahora
+        now = time.perf_counter()
+        with self._lock:
+            self.stages.append((stage, (now - self.last) * 1000, (now - self.start) * 1000))
+            self.last = now
+
+    def record(self, stage, duration_ms):
+        # Etapa que corre en paralelo (p. ej. en otro hilo)
+        now = time.perf_counter()
+        with self._lock:
+            self.stages.append((f"{stage} (paralelo)", duration_ms, (now - self.start) * 1000))
+
+    def report(self):
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+
+        print("[STARTUP] Etapa                          Duración   Acumulado")
+        with self._lock:
+            for stage, duration, elapsed in self.stages:
+                print(f"[STARTUP] {stage:<28} {duration:9.1f} ms {elapsed:9.1f} ms")
@@ -0,0 +1,172 @@
+import json
+import time
+import logging
+import vlc
+import customtkinter as ctk
+
+logger = logging.getLogger(__name__)
+
+class StatsOverlay:
+    # Estadísticas de libvlc (media.get_stats) muestreadas cada segundo. Se
+    # muestran en un panel sobre el video y, con --stats-log, se añaden como
+    # líneas JSON a un archivo junto con marcas de eventos (búsquedas,
+    # cambios de subtítulo, pantalla completa...) para relacionarlos con las
+    # imágenes perdidas. Solo se muestrea con el panel visible o el log activo.
+
+    INTERVAL_MS = 1000
+    # Segundos que una marca de evento sigue visible en el panel
+    MARK_VISIBLE_S = 5
+
+    # Contadores acumulados de libvlc; se guardan como diferencia por intervalo.
+    # libvlc 3 cuenta las imágenes tardías dentro de lost_pictures.
+    COUNTERS = (
+        'decoded_video',
+        'displayed_pictures',
+        'lost_pictures',
+        'decoded_audio',
+        'lost_abuffers',
+        'demux_corrupted',
+        'demux_discontinuity'
+    )
+
+    def __init__(self, player, log_path=None):
+        self.player = player
+        self.locale = player.locale
+        self.visible = False
+        self.label = None
+        self._log = None
+        self._active = False
+        self._scheduled = False
+        self._previous = None
+        self._last_mark = None
+
+        if log_path:
+            try:
+                self._log = open(log_path, 'a', encoding='utf-8', buffering=1)
+                logger.info("[STATS] Registrando estadísticas en %s", log_path)
+            except OSError as e:
+                logger.warning("[STATS] No se pudo abrir %s: %s", log_path, e)
+
+    def start(self):
+        # Llamado al empezar cada video
+        self._previous = None
+        self._active = True
+        self.mark('open', path=self.player.video_path)
+        self._update_schedule()
+
+    def stop(self):
+        if self._active:
+            self.mark('close')
+        self._active = False
+        self._update_schedule()
+
+    def close(self):
+        self.stop()
+        self.hide()
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        self.visible = True
+        if self.label is None:
+            self.label = ctk.CTkLabel(
+                self.player.root,
+                text=self.locale["stats_waiting"],
+                justify="left",
+                anchor="nw",
+                font=("Courier", 12),
+                fg_color="#202227",
+                text_color="white",
+                corner_radius=4
+            )
+        self.label.place(x=10, y=10)
+        self.label.lift()
+        self._update_schedule()
+
+    def hide(self):
+        self.visible = False
+        if self.label:
+            self.label.place_forget()
+        self._update_schedule()
+
+    def mark(self, event, **details):
+        if not self._active:
+            return
+        self._last_mark = (time.monotonic(), event)
+        if self._log:
+            entry = {'t': round(time.time(), 3), 'event': event, 'position': self.player.player.get_time()}
+            entry.update(details)
+            self._write(entry)
+
+    def _update_schedule(self):
+        wanted = self._active and (self.visible or self._log is not None)
+        if wanted and not self._scheduled:
+            self.player.clock.register('stats', self._sample, self.INTERVAL_MS, 0)
+        elif not wanted and self._scheduled:
+            self.player.clock.unregister('stats')
+        self._scheduled = wanted
+
+    def _write(self, entry):
+        try:
+            self._log.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        except (OSError, ValueError) as e:
+            logger.error("[STATS] Error escribiendo el registro: %s", e)
+            self._log = None
+            self._update_schedule()
+
+    def _sample(self):
+        media = self.player.media
+        if media is None:
+            return None
+
+        stats = vlc.MediaStats()
+        if not media.get_stats(stats):
+            return None
+
+        current = {field: getattr(stats, field) for field in self.COUNTERS}
+        previous, self._previous = self._previous, current
+        # Sin referencia, o contadores reiniciados porque el media se reabrió
+        if previous is None or any(current[f] < previous[f] for f in self.COUNTERS):
+            return None
+
+        sample = {
+            't': round(time.time(), 3),
+            'position': self.player.player.get_time(),
+            # libvlc da los bitrates en bytes/µs
+            'input_kbps': round(stats.input_bitrate * 8000),
+            'demux_kbps': round(stats.demux_bitrate * 8000)
+        }
+        for field in self.COUNTERS:
+            sample[field] = current[field] - previous[field]
+
+        if self._log:
+            self._write(sample)
+        if self.visible:
+            self._render(sample)
+        return None
+
+    def _render(self, sample):
+        lines = [
+            self.locale["stats_bitrate"].format(sample['input_kbps'], sample['demux_kbps']),
+            self.locale["stats_video"].format(
+                sample['decoded_video'], sample['displayed_pictures'], sample['lost_pictures']),
+            self.locale["stats_audio"].format(sample['decoded_audio'], sample['lost_abuffers'])
+        ]
+
+        decoder = getattr(self.player, 'decoder', None)
+        if decoder and decoder.current:
+            lines.append(self.locale["stats_decoder"].format(decoder.current))
+
+        if self._last_mark:
+            age = time.monotonic() - self._last_mark[0]
+            if age <= self.MARK_VISIBLE_S:
+                lines.append(self.locale["stats_mark"].format(self._last_mark[1], age))
+
+        self.label.configure(text="\n".join(lines))
@@ -0,0 +1,197 @@
+import os
+import re
+import bisect
+import logging
+import threading
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+CUE_EXTENSIONS = ('.srt', '.vtt', '.ass', '.ssa')
+
+# 00:01:02,345 (SRT) / 01:02.345 y 00:01:02.345 (VTT)
+_TIMESTAMP = re.compile(r'(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})')
+_HTML_TAGS = re.compile(r'<[^>]*>')
+_ASS_TAGS = re.compile(r'\{[^}]*\}')
+
+def _to_ms(hours, minutes, seconds, fraction):
+    # La fracción puede venir con 1-3 cifras (centésimas en ASS)
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(fraction.ljust(3, '0')[:3])
+
+def _normalize(text):
+    # Búsqueda sin distinguir mayúsculas ni tildes
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+class SubtitleCues:
+    # Índice de diálogos de un archivo SRT/VTT/ASS ordenado por tiempo de
+    # inicio. El archivo se lee una sola vez, línea a línea, en un hilo aparte;
+    # hasta que termina todas las consultas devuelven None. Las búsquedas por
+    # tiempo son bisect sobre la lista de inicios.
+
+    # Margen para que "siguiente" no devuelva la línea en la que ya se está
+    NEXT_MARGIN_MS = 250
+    # Dentro de este tiempo desde el inicio de una línea "anterior" salta a la previa
+    PREVIOUS_GRACE_MS = 1500
+    # Cuántas líneas anteriores se revisan por si se solapan con la actual
+    OVERLAP_LOOKBACK = 8
+
+    def __init__(self, path):
+        self.path = path
+        self.cues = []
+        self.starts = []
+        self._search_texts = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def supports(path):
+        return os.path.splitext(path)[1].lower() in CUE_EXTENSIONS
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._load, daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        ext = os.path.splitext(self.path)[1].lower()
+        try:
+            with open(self.path, 'r', encoding='utf-8-sig', errors='replace') as f:
+                if ext in ('.ass', '.ssa'):
+                    cues = self._parse_ass(f)
+                else:
+                    cues = self._parse_timed_blocks(f)
+        except OSError as e:
+            logger.warning("[CUES] No se pudo leer %s: %s", self.path, e)
+            cues = []
+
+        cues.sort(key=lambda cue: cue[0])
+        self.cues = cues
+        self.starts = [cue[0] for cue in cues]
+        self._ready.set()
+        logger.debug("[CUES] %s líneas indexadas de %s", len(cues), self.path)
+
+    def _parse_timed_blocks(self, lines):
+        # SRT y VTT: una línea "inicio --> fin" seguida del texto hasta una
+        # línea en blanco. Números de bloque, WEBVTT, NOTE y STYLE se ignoran.
+        cues = []
+        start = end = None
+        text = []
+        for line in lines:
+            line = line.strip()
+            if '-->' in line:
+                if start is not None and text:
+                    cues.append((start, end, '\n'.join(text)))
+                left, _, right = line.partition('-->')
+                start_match = _TIMESTAMP.search(left)
+                end_match = _TIMESTAMP.search(right)
+                if start_match and end_match:
+                    start = _to_ms(*start_match.groups())
+                    end = _to_ms(*end_match.groups())
+                else:
+                    start = None
+                text = []
+            elif not line:
+                if start is not None and text:
+                    cues.append((start, end, '\n'.join(text)))
+                start = None
+                text = []
+            elif start is not None:
+                line = _ASS_TAGS.sub('', _HTML_TAGS.sub('', line)).strip()
+                if line:
+                    text.append(line)
+
+        if start is not None and text:
+            cues.append((start, end, '\n'.join(text)))
+        return cues
+
+    def _parse_ass(self, lines):
+        cues = []
+        in_events = False
+        fields = None
+        for line in lines:
+            line = line.strip()
+            if line.startswith('['):
+                in_events = line.lower() == '[events]'
+                continue
+            if not in_events:
+                continue
+
+            kind, _, value = line.partition(':')
+            kind = kind.strip().lower()
+            if kind == 'format':
+                fields = [field.strip().lower() for field in value.split(',')]
+            elif kind == 'dialogue' and fields and 'text' in fields:
+                values = value.split(',', len(fields) - 1)
+                if len(values) != len(fields):
+                    continue
+                row = dict(zip(fields, values))
+                start_match = _TIMESTAMP.search(row.get('start', ''))
+                end_match = _TIMESTAMP.search(row.get('end', ''))
+                if not (start_match and end_match):
+                    continue
+                # Las etiquetas {\...} y los dibujos no son diálogo
+                text = _ASS_TAGS.sub('', row['text'])
+                text = text.replace('\\N', '\n').replace('\\n', '\n').replace('\\h', ' ').strip()
+                if text:
+                    cues.append((_to_ms(*start_match.groups()), _to_ms(*end_match.groups()), text))
+        return cues
+
+    def cue_at(self, ms):
+        if not self.ready:
+            return None
+        index = bisect.bisect_right(self.starts, ms) - 1
+        for i in range(index, max(index - self.OVERLAP_LOOKBACK, -1), -1):
+            if self.cues[i][1] > ms:
+                return self.cues[i]
+        return None
+
+    def next_cue(self, ms):
+        if not self.ready:
+            return None
+        index = bisect.bisect_right(self.starts, ms + self.NEXT_MARGIN_MS)
+        return self.cues[index] if index < len(self.cues) else None
+
+    def previous_cue(self, ms):
+        # Como "pista anterior": al principio de una línea va a la previa,
+        # más adelante vuelve al inicio de la actual
+        if not self.ready:
+            return None
+        index = bisect.bisect_left(self.starts, ms - self.PREVIOUS_GRACE_MS) - 1
+        return self.cues[index] if index >= 0 else None
+
+    def silence_end(self, ms, min_gap_ms):
+        # Inicio de la próxima línea si ahora no hay diálogo y falta al menos
+        # min_gap_ms para ella; None si no hay silencio que saltar
+        if not self.ready or self.cue_at(ms):
+            return None
+        index = bisect.bisect_right(self.starts, ms)
+        if index >= len(self.cues):
+            return None
+        start = self.cues[index][0]
+        return start if start - ms >= min_gap_ms else None
+
+    def search(self, query, after_ms=0):
+        # Primera línea que contiene el texto después de after_ms; al llegar
+        # al final se sigue desde el principio
+        if not self.ready or not self.cues:
+            return None
+        query = _normalize(query.strip())
+        if not query:
+            return None
+        if self._search_texts is None:
+            self._search_texts = [_normalize(' '.join(cue[2].split())) for cue in self.cues]
+
+        first = bisect.bisect_right(self.starts, after_ms + self.NEXT_MARGIN_MS)
+        count = len(self.cues)
+        for offset in range(count):
+            index = (first + offset) % count
+            if query in self._search_texts[index]:
+                return self.cues[index]
+        return None
@@ -0,0 +1,115 @@
+import os
+import codecs
+import hashlib
+import logging
+from PMDB_MP.paths import get_cache_dir, file_identity, read_json_cache, write_json_cache
+
+logger = logging.getLogger(__name__)
+
+# Formatos de texto que se convierten (.sub puede ser VobSub, que es binario)
+TEXT_SUBTITLE_EXTENSIONS = ('.srt', '.vtt', '.ass', '.ssa')
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
+def detect_encoding(data):
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    try:
+        data.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    # Los subtítulos que no son UTF-8 son casi siempre Windows-1252 o
+    # Latin-1; cp1252 cubre Latin-1 salvo cinco bytes sin asignar
+    try:
+        data.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+class SubtitleNormalizer:
+    # Copia en UTF-8 de los subtítulos con otra codificación, para que libvlc
+    # no tenga que adivinarla. La copia se nombra por el hash del contenido
+    # y un índice por identidad del archivo (ruta, tamaño y fecha) evita
+    # volver a leerlo y detectar la codificación en los siguientes arranques.
+
+    MAX_FILES = 500
+
+    def __init__(self):
+        self.cache_dir = get_cache_dir('subtitles')
+        self.index_path = self.cache_dir / 'index.json'
+        self._index = read_json_cache(self.index_path)
+
+    def _write_index(self):
+        try:
+            write_json_cache(self.index_path, self._index)
+        except OSError as e:
+            logger.warning("[SUB_ENCODING] No se pudo guardar el índice: %s", e)
+
+    def normalize(self, path):
+        # Devuelve la ruta que hay que pasar a libvlc: la original si ya es
+        # UTF-8, o la copia convertida
+        if os.path.splitext(path)[1].lower() not in TEXT_SUBTITLE_EXTENSIONS:
+            return path
+        identity = file_identity(path)
+        if not identity:
+            return path
+
+        entry = self._index.get(identity)
+        if entry:
+            if not entry.get('file'):
+                return path
+            cached_path = self.cache_dir / entry['file']
+            if cached_path.exists():
+                logger.debug("[SUB_ENCODING] %s (%s) desde caché", path, entry['encoding'])
+                return str(cached_path)
+
+        try:
+            entry = self._convert(path)
+        except (OSError, UnicodeError) as e:
+            logger.warning("[SUB_ENCODING] No se pudo convertir %s: %s", path, e)
+            return path
+
+        self._index.pop(identity, None)
+        self._index[identity] = entry
+        while len(self._index) > self.MAX_FILES:
+            self._forget(next(iter(self._index)))
+        self._write_index()
+        return str(self.cache_dir / entry['file']) if entry['file'] else path
+
+    def _convert(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        encoding = detect_encoding(data)
+        if encoding in ('utf-8', 'utf-8-sig'):
+            logger.debug("[SUB_ENCODING] %s ya es UTF-8", path)
+            return {'file': None, 'encoding': encoding}
+
+        # La extensión se conserva: libvlc elige el formato por ella
+        name = f"{hashlib.sha1(data).hexdigest()}{os.path.splitext(path)[1].lower()}"
+        cached_path = self.cache_dir / name
+        if not cached_path.exists():
+            tmp_path = cached_path.with_name(f"{name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data.decode(encoding).encode('utf-8'))
+                os.replace(tmp_path, cached_path)
+            except OSError:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        logger.info("[SUB_ENCODING] %s convertido de %s a UTF-8", path, encoding)
+        return {'file': name, 'encoding': encoding}
+
+    def _forget(self, identity):
+        entry = self._index.pop(identity)
+        name = entry.get('file')
+        # La misma copia puede servir a otro archivo con idéntico contenido
+        if name and not any(other.get('file') == name for other in self._index.values()):
+            (self.cache_dir / name).unlink(missing_ok=True)
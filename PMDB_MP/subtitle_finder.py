@@ -0,0 +1,201 @@
+import os
+import re
+import logging
+from difflib import SequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_EXTENSIONS = ('.srt', '.ass', '.ssa', '.vtt', '.sub')
+# Subcarpetas habituales de subtítulos (se comparan en minúsculas)
+SUBTITLE_FOLDERS = ('subs', 'sub', 'subtitles', 'subtitulos', 'subtítulos')
+
+# Etiqueta del nombre del archivo -> código de idioma
+LANGUAGE_TAGS = {
+    'es': 'es', 'spa': 'es', 'esp': 'es', 'spanish': 'es', 'español': 'es', 'espanol': 'es',
+    'castellano': 'es', 'latino': 'es', 'lat': 'es',
+    'en': 'en', 'eng': 'en', 'english': 'en', 'ingles': 'en', 'inglés': 'en',
+    'fr': 'fr', 'fre': 'fr', 'fra': 'fr', 'french': 'fr',
+    'de': 'de', 'ger': 'de', 'deu': 'de', 'german': 'de',
+    'it': 'it', 'ita': 'it', 'italian': 'it',
+    'pt': 'pt', 'por': 'pt', 'portuguese': 'pt', 'ptbr': 'pt',
+    'ja': 'ja', 'jpn': 'ja', 'japanese': 'ja'
+}
+FORCED_TAGS = ('forced', 'forzados', 'forzado')
+FLAG_TAGS = FORCED_TAGS + ('sdh', 'cc', 'hi', 'full', 'default')
+
+_SEPARATORS = re.compile(r'[.\s_\-\[\]()]+')
+_EPISODE = re.compile(r's(\d{1,2})[ ._-]?e(\d{1,3})|(\d{1,2})x(\d{2,3})', re.IGNORECASE)
+
+def _tokens(text):
+    return [token for token in _SEPARATORS.split(text.lower()) if token]
+
+def _distinct_tokens(a, b):
+    # Palabras que cambian de título aunque se parezcan: números o años
+    # (Rocky 2, Dune 2021) y plurales (Alien / Aliens)
+    if any(char.isdigit() for char in a + b):
+        return True
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    return longer in (shorter + 's', shorter + 'es')
+
+def _episode(text):
+    match = _EPISODE.search(text)
+    if not match:
+        return None
+    season, episode = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+    return int(season), int(episode)
+
+
+class SubtitleFinder:
+    # Busca subtítulos externos con un solo scandir de la carpeta del video
+    # (y de Subs/ y similares). El listado de cada carpeta se guarda en
+    # memoria junto con su mtime: abrir el siguiente episodio de la misma
+    # carpeta solo cuesta un stat por carpeta.
+
+    # Similitud mínima entre nombres cuando no coinciden exactamente
+    FUZZY_THRESHOLD = 0.8
+    STRONG_SCORE = 70
+    MAX_DIRECTORIES = 64
+
+    def __init__(self):
+        self._index = {}
+
+    def find(self, video_path, language=None):
+        # Devuelve los candidatos ordenados del mejor al peor:
+        # {'path', 'language', 'forced', 'score', 'fuzzy'}. Los aproximados
+        # (fuzzy) van al final y no deben cargarse sin que el usuario lo pida.
+        directory = os.path.dirname(os.path.abspath(video_path))
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        video = {
+            'stem': stem.lower(),
+            'key': ' '.join(_tokens(stem)),
+            'episode': _episode(stem)
+        }
+
+        index = self._scan(directory)
+        if index is None:
+            return []
+
+        candidates = self._match(directory, index['files'], video)
+        for folder_key, folder_name in index['folders'].items():
+            if folder_key not in SUBTITLE_FOLDERS:
+                continue
+            sub_dir = os.path.join(directory, folder_name)
+            sub_index = self._scan(sub_dir)
+            if sub_index is None:
+                continue
+            candidates.extend(self._match(sub_dir, sub_index['files'], video))
+
+            # Subs/<nombre del video>/2_English.srt
+            named = sub_index['folders'].get(video['stem'])
+            if named:
+                named_dir = os.path.join(sub_dir, named)
+                named_index = self._scan(named_dir)
+                if named_index:
+                    candidates.extend(self._match(named_dir, named_index['files'], video, named_folder=True))
+
+        candidates.sort(key=lambda c: self._rank(c, language))
+        if logger.isEnabledFor(logging.DEBUG):
+            for candidate in candidates:
+                logger.debug("[FIND_SUB] Candidato: %s", candidate)
+        return candidates
+
+    def _rank(self, candidate, language):
+        if language and candidate['language'] == language:
+            language_rank = 0
+        elif candidate['language'] is None:
+            language_rank = 1
+        else:
+            language_rank = 2
+        # Un parecido aproximado nunca gana a una coincidencia por nombre o episodio
+        return candidate['fuzzy'], language_rank, candidate['forced'], -candidate['score'], candidate['path']
+
+    def _match(self, directory, files, video, named_folder=False):
+        candidates = []
+        for name in files:
+            sub_stem = os.path.splitext(name)[0]
+            result = self._score(sub_stem, video, named_folder)
+            if result is None:
+                continue
+            score, tags = result
+            languages = [LANGUAGE_TAGS[tag] for tag in tags if tag in LANGUAGE_TAGS]
+            candidates.append({
+                'path': os.path.join(directory, name),
+                'language': languages[-1] if languages else None,
+                'forced': any(tag in FORCED_TAGS for tag in tags),
+                'score': score,
+                'fuzzy': score < self.STRONG_SCORE
+            })
+        return candidates
+
+    def _score(self, sub_stem, video, named_folder):
+        lower = sub_stem.lower()
+        if lower == video['stem']:
+            return 100, []
+
+        # pelicula.en.srt, pelicula.forced.spa.ass
+        prefix = video['stem']
+        if lower.startswith(prefix) and _SEPARATORS.match(lower, len(prefix)):
+            tags = _tokens(sub_stem[len(prefix):])
+            if all(tag in LANGUAGE_TAGS or tag in FLAG_TAGS for tag in tags):
+                return 90, tags
+
+        if named_folder:
+            return 80, _tokens(sub_stem)
+
+        tokens = _tokens(sub_stem)
+        tags = []
+        while tokens and (tokens[-1] in LANGUAGE_TAGS or tokens[-1] in FLAG_TAGS):
+            tags.insert(0, tokens.pop())
+        if not tokens:
+            return None
+
+        # En una carpeta de temporada el episodio tiene que coincidir
+        sub_episode = _episode(sub_stem)
+        if video['episode'] and sub_episode:
+            if sub_episode != video['episode']:
+                return None
+            return 70, tags
+
+        # Solo variantes de escritura del mismo título: mismas palabras en
+        # número y ninguna diferencia de número, año o plural
+        video_tokens = video['key'].split()
+        if len(tokens) != len(video_tokens):
+            return None
+        if any(a != b and _distinct_tokens(a, b) for a, b in zip(tokens, video_tokens)):
+            return None
+
+        ratio = SequenceMatcher(None, ' '.join(tokens), video['key']).ratio()
+        if ratio < self.FUZZY_THRESHOLD:
+            return None
+        return int(60 * ratio), tags
+
+    def _scan(self, directory):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self._index.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        files = []
+        folders = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if os.path.splitext(entry.name)[1].lower() in SUBTITLE_EXTENSIONS:
+                        files.append(entry.name)
+                    elif entry.is_dir():
+                        folders[entry.name.lower()] = entry.name
+        except OSError as e:
+            logger.warning("[FIND_SUB] No se pudo leer %s: %s", directory, e)
+            return None
+
+        index = {'files': files, 'folders': folders}
+        self._index.pop(directory, None)
+        self._index[directory] = (mtime, index)
+        if len(self._index) > self.MAX_DIRECTORIES:
+            del self._index[next(iter(self._index))]
+        logger.debug("[FIND_SUB] %s: %s subtítulos, %s carpetas", directory, len(files), len(folders))
+        return index
@@ -2,8 +2,12 @@ import customtkinter as ctk
 from PMDB_MP.locales import get_locale
 
 class SubtitleMenu:
-    def __init__(self, root, parent_frame, embedded_subtitles, select_callback, locale=None):
+    def __init__(self, root, parent_frame, embedded_subtitles, select_callback, locale=None,
+                 title_key="select_subtitle", disable_key="disable_subtitles"):
+        # También sirve para las pistas de audio: sin disable_key no hay opción de desactivar
         self.locale = locale or get_locale("es")
+        self.title_key = title_key
+        self.disable_key = disable_key
         self.root = root
         self.parent_frame = parent_frame
         self.embedded_subtitles = embedded_subtitles
@@ -48,7 +52,7 @@ class SubtitleMenu:
 
         title_label = ctk.CTkLabel(
             content_frame,
-            text=self.locale["select_subtitle"],
+            text=self.locale[self.title_key],
             fg_color=bg_color,
             text_color=text_color,
             font=("Segoe UI", 12, "bold")
@@ -66,23 +70,24 @@ class SubtitleMenu:
             self.select_callback(sub_id)
             self._close_menu()
 
-        disable_btn = ctk.CTkButton(
-            content_frame,
-            text=self.locale["disable_subtitles"],
-            fg_color=btn_color,
-            text_color=text_color,
-            hover_color=hover_color,
-            command=lambda: select_and_close(-1)
-        )
-        disable_btn.pack(fill='x', padx=5, pady=2)
+        if self.disable_key:
+            disable_btn = ctk.CTkButton(
+                content_frame,
+                text=self.locale[self.disable_key],
+                fg_color=btn_color,
+                text_color=text_color,
+                hover_color=hover_color,
+                command=lambda: select_and_close(-1)
+            )
+            disable_btn.pack(fill='x', padx=5, pady=2)
 
-        # Separador
-        separator2 = ctk.CTkFrame(
-            content_frame,
-            height=1,
-            fg_color=separator_color
-        )
-        separator2.pack(fill='x', pady=2)
+            # Separador
+            separator2 = ctk.CTkFrame(
+                content_frame,
+                height=1,
+                fg_color=separator_color
+            )
+            separator2.pack(fill='x', pady=2)
 
         max_scroll_height = container_top - 20
         scroll_height = min(max_scroll_height, 150)
@@ -153,6 +158,9 @@ class SubtitleMenu:
         self.subtitle_menu_frame.bind("<FocusOut>", on_focus_out)
         self.subtitle_menu_frame.focus_set()
 
+    def close(self):
+        self._close_menu()
+
     def _close_menu(self):
         if self.subtitle_menu_frame and self.subtitle_menu_frame.winfo_exists():
             self.subtitle_menu_frame.destroy()
@@ -0,0 +1,53 @@
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+_UNKNOWN = object()
+
+class ThemeManager:
+    # Aplica estilos a los widgets de customtkinter recordando lo que ya
+    # tiene cada uno. Cada configure() redibuja el canvas del widget, así que
+    # solo se envían las opciones que cambian; volver a aplicar el mismo
+    # estilo no cuesta nada.
+
+    def __init__(self):
+        # Los widgets destruidos desaparecen solos del registro
+        self._applied = weakref.WeakKeyDictionary()
+        self.configure_calls = 0
+
+    def apply(self, widget, **style):
+        applied = self._applied.get(widget)
+        if applied is None:
+            applied = self._applied[widget] = {}
+
+        changes = {}
+        for key, value in style.items():
+            if key not in applied:
+                # La primera vez se parte de lo que puso el constructor
+                applied[key] = self._read(widget, key)
+            if applied[key] != value:
+                changes[key] = value
+
+        if not changes:
+            return False
+
+        try:
+            widget.configure(**changes)
+        except Exception as e:
+            logger.error("[THEME] Error configurando %s: %s", widget, e)
+            return False
+
+        applied.update(changes)
+        self.configure_calls += 1
+        logger.debug("[THEME] %s <- %s", widget, changes)
+        return True
+
+    def forget(self, widget):
+        self._applied.pop(widget, None)
+
+    def _read(self, widget, key):
+        try:
+            return widget.cget(key)
+        except Exception:
+            return _UNKNOWN
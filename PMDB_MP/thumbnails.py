@@ -0,0 +1,270 @@
+import os
+import ctypes
+import threading
+import time
+import logging
+from collections import OrderedDict
+import vlc
+from PIL import Image
+from PMDB_MP.paths import get_cache_dir, file_identity
+
+logger = logging.getLogger(__name__)
+
+class ThumbnailExtractor:
+    # Miniaturas para la vista previa de la barra de progreso. Un hilo con su
+    # propia instancia de libvlc (sin audio ni ventana) decodifica fotogramas
+    # en memoria a intervalos fijos y los guarda en disco; las últimas usadas
+    # se mantienen también en memoria.
+
+    WIDTH = 160
+    MIN_INTERVAL_MS = 10000
+    MAX_THUMBNAILS = 240
+    MEMORY_ITEMS = 64
+    FRAME_TIMEOUT = 2.0
+    # Pausa entre extracciones en segundo plano para no competir con la reproducción
+    IDLE_DELAY = 0.1
+    # Tamaño máximo de la caché de miniaturas de todos los videos; se borran
+    # primero las carpetas de los videos abiertos hace más tiempo
+    MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+    VLC_ARGS = [
+        '--quiet',
+        '--no-audio',
+        '--no-spu',
+        '--no-osd',
+        '--no-xlib',
+        '--no-sub-autodetect-file',
+        '--input-fast-seek',
+        '--avcodec-threads=1'
+    ]
+
+    def __init__(self, video_path, duration_ms, video_size=None, on_ready=None):
+        self.video_path = video_path
+        self.duration = duration_ms
+        self.interval = max(self.MIN_INTERVAL_MS, duration_ms // self.MAX_THUMBNAILS)
+        self.count = max(1, duration_ms // self.interval + 1)
+        self.on_ready = on_ready
+
+        width, height = video_size or (16, 9)
+        if not width or not height:
+            width, height = 16, 9
+        self.size = (self.WIDTH, max(2, int(self.WIDTH * height / width) // 2 * 2))
+
+        identity = file_identity(video_path)
+        if identity is None:
+            raise FileNotFoundError(video_path)
+        self.cache_dir = get_cache_dir('thumbnails', identity)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._on_disk = self._scan_cache_dir()
+        self._failed = set()
+        # Los fallidos se reintentan una vez, cuando ya no queda nada más
+        self._retried = set()
+        self._priority = None
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def _scan_cache_dir(self):
+        indexes = set()
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                if ext == '.jpg' and name.isdigit():
+                    indexes.add(int(name))
+        return indexes
+
+    def _thumb_path(self, index):
+        return self.cache_dir / f"{index}.jpg"
+
+    def index_for(self, position):
+        position = min(max(position, 0.0), 1.0)
+        return min(int(position * self.duration) // self.interval, self.count - 1)
+
+    def get(self, position):
+        # Devuelve la miniatura más cercana ya disponible (PIL.Image) o None,
+        # y prioriza su extracción si todavía no existe.
+        index = self.index_for(position)
+
+        with self._lock:
+            image = self._memory.get(index)
+            if image is not None:
+                self._memory.move_to_end(index)
+                return image
+            on_disk = index in self._on_disk
+
+        if on_disk:
+            try:
+                image = Image.open(self._thumb_path(index))
+                image.load()
+                self._remember(index, image)
+                return image
+            except Exception as e:
+                logger.warning("[THUMBS] Miniatura dañada %s: %s", index, e)
+                with self._lock:
+                    self._on_disk.discard(index)
+
+        # _priority lo lee y lo vacía el hilo de extracción
+        with self._lock:
+            self._priority = index
+        self._wakeup.set()
+        return None
+
+    def _remember(self, index, image):
+        with self._lock:
+            self._memory[index] = image
+            self._memory.move_to_end(index)
+            while len(self._memory) > self.MEMORY_ITEMS:
+                self._memory.popitem(last=False)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1)
+
+    def _next_index(self):
+        with self._lock:
+            priority = self._priority
+            self._priority = None
+            if priority is not None and priority not in self._on_disk and priority not in self._failed:
+                return priority
+            for index in range(self.count):
+                if index not in self._on_disk and index not in self._failed:
+                    return index
+            for index in sorted(self._failed - self._retried):
+                self._retried.add(index)
+                self._failed.discard(index)
+                return index
+        return None
+
+    def _prune_cache(self):
+        # La carpeta de este video cuenta como recién usada
+        root = self.cache_dir.parent
+        os.utime(self.cache_dir)
+        folders = []
+        total = 0
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                size = 0
+                with os.scandir(entry.path) as files:
+                    for thumb in files:
+                        size += thumb.stat().st_size
+                folders.append((entry.stat().st_mtime, size, entry.path))
+                total += size
+
+        for mtime, size, path in sorted(folders):
+            if total <= self.MAX_CACHE_BYTES:
+                break
+            if path == str(self.cache_dir):
+                continue
+            for thumb in os.scandir(path):
+                os.unlink(thumb.path)
+            os.rmdir(path)
+            total -= size
+            logger.debug("[THUMBS] Caché de %s eliminada", path)
+
+    def _run(self):
+        width, height = self.size
+        pitch = width * 4
+        buffer = ctypes.create_string_buffer(pitch * height)
+        frame_ready = threading.Event()
+        # Copia del último fotograma hecha en el propio callback: fuera de él
+        # libvlc puede estar escribiendo ya el siguiente en el mismo búfer
+        frame = {}
+
+        # Los callbacks se guardan en variables locales para que no los libere el GC
+        @vlc.CallbackDecorators.VideoLockCb
+        def lock_cb(opaque, planes):
+            planes[0] = ctypes.cast(buffer, ctypes.c_void_p).value
+            return None
+
+        @vlc.CallbackDecorators.VideoDisplayCb
+        def display_cb(opaque, picture):
+            frame['data'] = buffer.raw
+            frame_ready.set()
+
+        try:
+            self._prune_cache()
+        except OSError as e:
+            logger.warning("[THUMBS] No se pudo limpiar la caché: %s", e)
+
+        instance = None
+        player = None
+        try:
+            instance = vlc.Instance(self.VLC_ARGS)
+            player = instance.media_player_new()
+            player.video_set_callbacks(lock_cb, None, display_cb, None)
+            player.video_set_format("RV32", width, height, pitch)
+            player.set_media(instance.media_new(self.video_path))
+            player.audio_set_mute(True)
+
+            while self._running:
+                index = self._next_index()
+                if index is None:
+                    # Todo extraído: solo queda esperar a que se detenga
+                    self._wakeup.wait()
+                    self._wakeup.clear()
+                    continue
+
+                target = index * self.interval
+                image = self._grab_frame(player, target, frame, frame_ready)
+                if image is None:
+                    with self._lock:
+                        self._failed.add(index)
+                    continue
+
+                image.save(self._thumb_path(index), "JPEG", quality=80)
+                self._remember(index, image)
+                with self._lock:
+                    self._on_disk.add(index)
+                if self.on_ready:
+                    # Llamado desde este hilo: no debe tocar Tk (el reproductor
+                    # lo encola para el hilo de la interfaz)
+                    self.on_ready(index)
+
+                with self._lock:
+                    idle = self._priority is None
+                if idle:
+                    self._wakeup.wait(self.IDLE_DELAY)
+                    self._wakeup.clear()
+        except Exception as e:
+            logger.exception("[THUMBS] Error extrayendo miniaturas: %s", e)
+        finally:
+            if player:
+                player.stop()
+                player.release()
+            if instance:
+                instance.release()
+
+    def _grab_frame(self, player, target, frame, frame_ready):
+        width, height = self.size
+
+        if player.get_state() in (vlc.State.NothingSpecial, vlc.State.Stopped, vlc.State.Ended):
+            player.play()
+        player.set_time(target)
+        player.set_pause(0)
+
+        deadline = time.monotonic() + self.FRAME_TIMEOUT
+        image = None
+        while self._running and time.monotonic() < deadline:
+            frame_ready.clear()
+            if not frame_ready.wait(timeout=0.2):
+                continue
+            # Hasta que la búsqueda se completa llegan fotogramas de la posición
+            # anterior, que puede estar antes o después del destino
+            if abs(player.get_time() - target) <= self.interval // 2:
+                image = Image.frombuffer("RGBA", (width, height), frame['data'], "raw", "BGRA", 0, 1).convert("RGB")
+                break
+
+        player.set_pause(1)
+        return image
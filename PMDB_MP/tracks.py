@@ -0,0 +1,77 @@
+import logging
+import vlc
+from PMDB_MP.paths import get_cache_dir, file_identity, read_json_cache, write_json_cache
+
+logger = logging.getLogger(__name__)
+
+def fourcc(codec):
+    return codec.to_bytes(4, 'little').decode('ascii', 'replace').strip('\x00 ')
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return value or None
+
+def read_tracks(media):
+    # Pistas del media ya analizado (parse_with_options), sin esperar a que
+    # empiece la reproducción: {'video': [...], 'audio': [...], 'subtitles': [...]}
+    tracks = {'video': [], 'audio': [], 'subtitles': []}
+    for track in media.tracks_get() or []:
+        language = _text(track.language)
+        description = _text(track.description)
+        info = {
+            'id': track.id,
+            'codec': fourcc(track.codec),
+            'language': language,
+            'description': description
+        }
+
+        if track.type == vlc.TrackType.video:
+            info['width'] = track.video.contents.width
+            info['height'] = track.video.contents.height
+            kind = 'video'
+        elif track.type == vlc.TrackType.audio:
+            info['channels'] = track.audio.contents.channels
+            info['rate'] = track.audio.contents.rate
+            kind = 'audio'
+        elif track.type == vlc.TrackType.ext:
+            kind = 'subtitles'
+        else:
+            continue
+
+        label = f"[{language}]" if language else None
+        info['name'] = ' '.join(part for part in (description, label) if part) or f"Pista {len(tracks[kind]) + 1}"
+        tracks[kind].append(info)
+    return tracks
+
+
+class TrackCache:
+    # Pistas de cada archivo guardadas por identidad (ruta, tamaño y fecha):
+    # al reabrir un video el menú de subtítulos y el gamepad las tienen
+    # antes de que libvlc termine de analizarlo.
+
+    MAX_FILES = 500
+
+    def __init__(self):
+        self.cache_path = get_cache_dir() / 'tracks.json'
+        self._cache = read_json_cache(self.cache_path)
+
+    def _write_cache(self):
+        try:
+            write_json_cache(self.cache_path, self._cache)
+        except OSError as e:
+            logger.warning("[TRACKS] No se pudo guardar la caché de pistas: %s", e)
+
+    def get(self, video_path):
+        identity = file_identity(video_path)
+        return self._cache.get(identity) if identity else None
+
+    def put(self, video_path, tracks):
+        identity = file_identity(video_path)
+        if not identity or self._cache.get(identity) == tracks:
+            return
+        self._cache.pop(identity, None)
+        self._cache[identity] = tracks
+        while len(self._cache) > self.MAX_FILES:
+            self._cache.pop(next(iter(self._cache)))
+        self._write_cache()
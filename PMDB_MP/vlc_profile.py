@@ -0,0 +1,202 @@
+import os
+import glob
+import json
+import shutil
+import subprocess
+import threading
+import logging
+import vlc
+from PMDB_MP.paths import get_config_dir
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+logger = logging.getLogger(__name__)
+
+class VlcProfile:
+    # Perfiles de rendimiento de libvlc. Cada opción va a los argumentos de
+    # vlc.Instance o a las :opciones de cada media; el perfil se elige en
+    # vlc.toml / vlc.json (carpeta de configuración) y la línea de comandos
+    # tiene la última palabra.
+
+    # opción -> (destino, tipo)
+    SETTINGS = {
+        'vout': ('instance', str),
+        'file-caching': ('media', int),
+        'network-caching': ('media', int),
+        'avcodec-threads': ('media', int),
+        'avcodec-hw': ('media', str),
+        'avcodec-skiploopfilter': ('media', int),
+        'avcodec-fast': ('media', bool)
+    }
+
+    PRESETS = {
+        'default': {},
+        # Equipos con CPU modesta: decodificación por hardware y filtros baratos
+        'low-power-htpc': {
+            'avcodec-hw': 'any',
+            'avcodec-threads': 0,
+            'avcodec-skiploopfilter': 4,
+            'avcodec-fast': True,
+            'file-caching': 1500
+        },
+        # Archivos de mucho bitrate: más búfer de lectura y filtro completo
+        'high-bitrate-4k': {
+            'avcodec-hw': 'any',
+            'avcodec-threads': 0,
+            'avcodec-skiploopfilter': 0,
+            'file-caching': 3000,
+            'network-caching': 3000
+        }
+    }
+
+    CONFIG_FILES = ('vlc.toml', 'vlc.json')
+
+    def __init__(self, name='default', overrides=None):
+        if name not in self.PRESETS:
+            raise ValueError(f"Perfil de VLC desconocido: {name}")
+        self.name = name
+        self.settings = dict(self.PRESETS[name])
+        for key, value in (overrides or {}).items():
+            self.set(key, value)
+
+    @classmethod
+    def load(cls, name=None, overrides=None):
+        config = cls.read_config()
+        profile = cls(name or config.get('profile', 'default'), config.get('options'))
+        for key, value in (overrides or {}).items():
+            profile.set(key, value)
+        return profile
+
+    @classmethod
+    def read_config(cls):
+        config_dir = get_config_dir()
+        for filename in cls.CONFIG_FILES:
+            path = config_dir / filename
+            if not path.exists():
+                continue
+            if path.suffix == '.toml' and tomllib is None:
+                logger.warning("[VLC_PROFILE] %s requiere Python 3.11+, se ignora", path)
+                continue
+
+            try:
+                if path.suffix == '.toml':
+                    with open(path, 'rb') as f:
+                        config = tomllib.load(f)
+                else:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("[VLC_PROFILE] Error leyendo %s: %s", path, e)
+                return {}
+
+            if isinstance(config, dict):
+                logger.info("[VLC_PROFILE] Configuración cargada desde %s", path)
+                return config
+        return {}
+
+    def set(self, key, value):
+        if key not in self.SETTINGS:
+            raise ValueError(f"Opción de VLC desconocida: {key}")
+        kind = self.SETTINGS[key][1]
+        if kind is bool and isinstance(value, str):
+            value = value.strip().lower() in ('1', 'true', 'yes', 'on', 'si', 'sí')
+        self.settings[key] = kind(value)
+
+    def _format(self, prefix, key, value):
+        if isinstance(value, bool):
+            return f"{prefix}{key}" if value else f"{prefix}no-{key}"
+        return f"{prefix}{key}={value}"
+
+    def instance_args(self):
+        return [self._format('--', key, value) for key, value in self.settings.items()
+                if self.SETTINGS[key][0] == 'instance']
+
+    def media_options(self):
+        return [self._format(':', key, value) for key, value in self.settings.items()
+                if self.SETTINGS[key][0] == 'media']
+
+    def describe(self):
+        return f"{self.name} {self.settings}" if self.settings else self.name
+
+
+# Carpetas habituales de plugins de libvlc en Linux
+PLUGIN_DIR_PATTERNS = [
+    '/usr/lib/*/vlc/plugins',
+    '/usr/lib/vlc/plugins',
+    '/usr/lib64/vlc/plugins',
+    '/usr/local/lib/vlc/plugins'
+]
+
+def find_plugin_dir():
+    candidates = [os.getenv('VLC_PLUGIN_PATH'), getattr(vlc, 'plugin_path', None)]
+    for pattern in PLUGIN_DIR_PATTERNS:
+        candidates.extend(sorted(glob.glob(pattern)))
+
+    for path in candidates:
+        if not path:
+            continue
+        # python-vlc guarda en plugin_path la carpeta de VLC, no la de plugins
+        if os.path.isdir(os.path.join(path, 'plugins')):
+            path = os.path.join(path, 'plugins')
+        if os.path.isdir(path):
+            return path
+    return None
+
+def plugin_cache_is_valid(plugin_dir):
+    # Instalar o quitar un módulo cambia la fecha de su subcarpeta
+    try:
+        cache_mtime = os.stat(os.path.join(plugin_dir, 'plugins.dat')).st_mtime
+        with os.scandir(plugin_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.stat().st_mtime > cache_mtime:
+                    return False
+    except OSError:
+        return False
+    return True
+
+def _find_cache_gen(plugin_dir):
+    tool = shutil.which('vlc-cache-gen')
+    if tool:
+        return tool
+    for name in ('vlc-cache-gen', 'vlc-cache-gen.exe'):
+        path = os.path.join(os.path.dirname(plugin_dir), name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+_cache_thread = None
+
+def _regenerate_plugin_cache(tool, plugin_dir):
+    try:
+        subprocess.run([tool, plugin_dir], check=True, timeout=60,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error("[VLC_PROFILE] Error regenerando la caché de plugins: %s", e)
+        return
+    logger.info("[VLC_PROFILE] Caché de plugins regenerada en %s (se usará en el próximo arranque)", plugin_dir)
+
+def ensure_plugin_cache():
+    # Sin una caché válida libvlc escanea todos los plugins en cada arranque.
+    # vlc-cache-gen tarda tanto como ese escaneo, así que se ejecuta en segundo
+    # plano: este arranque no espera y el siguiente ya encuentra la caché.
+    global _cache_thread
+    plugin_dir = find_plugin_dir()
+    if not plugin_dir or plugin_cache_is_valid(plugin_dir):
+        return True
+    if _cache_thread and _cache_thread.is_alive():
+        return False
+
+    tool = _find_cache_gen(plugin_dir)
+    if not tool:
+        logger.warning("[VLC_PROFILE] Caché de plugins desactualizada en %s y no se encontró vlc-cache-gen", plugin_dir)
+        return False
+    if not os.access(plugin_dir, os.W_OK):
+        logger.warning("[VLC_PROFILE] Caché de plugins desactualizada; para regenerarla ejecute: sudo %s %s", tool, plugin_dir)
+        return False
+
+    _cache_thread = threading.Thread(target=_regenerate_plugin_cache, args=(tool, plugin_dir), daemon=True)
+    _cache_thread.start()
+    return False
@@ -4,11 +4,12 @@ import glob
 import shutil
 import PyInstaller.__main__
 from PyInstaller.utils.hooks import collect_data_files
+from PMDB_MP.icons import build_atlas
 
 def get_data_files():
     data_files = []
 
-    icons = glob.glob('assets/icons/*.png') + glob.glob('assets/icons/*.ico')
+    icons = glob.glob('assets/icons/*.png') + glob.glob('assets/icons/*.ico') + glob.glob('assets/icons/*.json')
     data_files.extend([(icon, 'assets/icons') for icon in icons])
     py_files = glob.glob('PMDB_MP/*.py')
     data_files.extend([(py_file, 'PMDB_MP') for py_file in py_files])
@@ -21,6 +22,9 @@ def build():
         print("Para Windows, por favor usa la versión portable con Python")
         return
 
+    # Los controles cargan los iconos desde una sola imagen
+    print(f"Atlas de iconos: {', '.join(build_atlas('assets/icons'))}")
+
     opts = [
         'main.py',
         '--name=PMDB_Media_Player',
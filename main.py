@@ -1,26 +1,125 @@
-# main.py
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
 import sys
 import argparse
-from PMDB_MP.player import VideoPlayer
-from PMDB_MP.locales import get_locale
+import logging
+from PMDB_MP.startup import StartupProfiler
+from PMDB_MP.daemon import PlayerDaemon, send_request, restart_process
+from PMDB_MP.log import setup_logging
+
+logger = logging.getLogger('PMDB_MP.main')
+
+def load_vlc_profile(parser, args):
+    # Importa vlc: solo se llama cuando hay que crear el reproductor
+    from PMDB_MP.vlc_profile import VlcProfile
+
+    overrides = {}
+    for option in args.vlc_option or []:
+        key, sep, value = option.partition('=')
+        if not sep:
+            parser.error(f"--vlc-option espera CLAVE=VALOR: {option}")
+        overrides[key.strip()] = value.strip()
+
+    try:
+        return VlcProfile.load(args.vlc_profile, overrides)
+    except ValueError as e:
+        parser.error(str(e))
+
+def run_daemon(args, profiler, vlc_profile):
+    # VLC, Tk y el tema se importan solo cuando hace falta crear el reproductor
+    from PMDB_MP.player import VideoPlayer
+
+    app = VideoPlayer(None, language=args.language, gamepad=args.gamepad,
+                      profiler=profiler, resident=True, vlc_profile=vlc_profile,
+                      stats_log=args.stats_log, hide_cursor=args.hide_cursor)
+    daemon = PlayerDaemon(app, idle_timeout=args.idle_timeout * 60, max_sessions=args.max_sessions)
+    try:
+        daemon.start()
+    except OSError as e:
+        logger.error("Error: %s", e)
+        app.shutdown()
+        sys.exit(1)
+
+    app.run()
+    if daemon.restart:
+        restart_process()
 
 def main():
     parser = argparse.ArgumentParser(description='PMDB Media Player')
-    parser.add_argument('video_path', help='Ruta del archivo de video')
+    parser.add_argument('video_path', nargs='?', help='Ruta del archivo de video')
     parser.add_argument('--fullscreen', action='store_true',
                       help='Iniciar en modo pantalla completa')
+    parser.add_argument('--hide-cursor', action='store_true',
+                      help='Ocultar el cursor junto con los controles en pantalla completa')
     parser.add_argument('--language', choices=['es', 'en'], default='es',
                       help='Idioma de la interfaz (es: español, en: inglés)')
+    parser.add_argument('--gamepad', choices=['auto', 'on', 'off'], default='auto',
+                      help='Soporte de gamepad (auto: solo si se detecta un mando)')
+    parser.add_argument('--profile-startup', action='store_true',
+                      help='Mostrar el tiempo de cada etapa del arranque')
+    parser.add_argument('--vlc-profile',
+                      help='Perfil de rendimiento de VLC: default, low-power-htpc o high-bitrate-4k')
+    parser.add_argument('--vlc-option', action='append', metavar='CLAVE=VALOR',
+                      help='Ajustar una opción del perfil de VLC, p. ej. file-caching=2000')
+    parser.add_argument('--stats-log', metavar='ARCHIVO',
+                      help='Añadir cada segundo las estadísticas de reproducción (JSON por línea) a ARCHIVO')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='WARNING',
+                      help='Nivel mínimo de los mensajes de registro')
+    parser.add_argument('--log-file', metavar='ARCHIVO',
+                      help='Escribir también el registro en ARCHIVO')
+    parser.add_argument('--daemon', action='store_true',
+                      help='Mantener el reproductor residente y abrir los videos de las siguientes llamadas')
+    parser.add_argument('--idle-timeout', type=int, default=30,
+                      help='Minutos sin peticiones antes de cerrar el daemon (0: nunca)')
+    parser.add_argument('--max-sessions', type=int, default=PlayerDaemon.MAX_SESSIONS,
+                      help='Videos reproducidos antes de reciclar el daemon (0: sin límite)')
+    parser.add_argument('--stop-daemon', action='store_true',
+                      help='Detener el daemon en ejecución')
+    parser.add_argument('--detach', action='store_true',
+                      help='Con el daemon activo, volver sin esperar a que termine el video')
+    parser.add_argument('--no-daemon', action='store_true',
+                      help='Abrir el video en un proceso nuevo aunque haya un daemon activo')
 
     args = parser.parse_args()
+    setup_logging(args.log_level, args.log_file)
+    profiler = StartupProfiler(enabled=args.profile_startup, start=STARTUP_T0)
+
+    if args.stop_daemon:
+        reply = send_request({'command': 'shutdown'})
+        print("Daemon detenido" if reply else "No hay ningún daemon en ejecución")
+        return
+
+    if args.daemon:
+        logger.info("Iniciando PMDB Media Player en modo daemon...")
+        run_daemon(args, profiler, load_vlc_profile(parser, args))
+        return
+
+    if not args.video_path:
+        parser.error("falta la ruta del archivo de video")
 
     if not os.path.exists(args.video_path):
-        print(f"Error: El archivo '{args.video_path}' no existe.")
+        logger.error("Error: El archivo '%s' no existe.", args.video_path)
         sys.exit(1)
 
-    print("Iniciando PMDB Media Player...")
-    app = VideoPlayer(args.video_path, language=args.language)
+    if not args.no_daemon:
+        reply = send_request({
+            'command': 'open',
+            'path': os.path.abspath(args.video_path),
+            'fullscreen': args.fullscreen
+        }, wait=not args.detach)
+        if reply and reply.get('status') in ('playing', 'ended'):
+            logger.info("Video enviado al daemon (%s)", reply['status'])
+            return
+        if reply:
+            logger.warning("El daemon no pudo abrir el video (%s), se abre en un proceso nuevo", reply.get('status'))
+
+    logger.info("Iniciando PMDB Media Player...")
+    from PMDB_MP.player import VideoPlayer
+    app = VideoPlayer(args.video_path, language=args.language, gamepad=args.gamepad,
+                      profiler=profiler, vlc_profile=load_vlc_profile(parser, args),
+                      stats_log=args.stats_log, hide_cursor=args.hide_cursor)
 
     if args.fullscreen:
         app.root.after(100, app._toggle_fullscreen)